@@ -1,20 +1,61 @@
 import os
 import io
-import contextlib
 import difflib
 import string
 import random
-import spacy
 import sqlite3
-import socket
+import json
 import subprocess
+import threading
 import time
+import asyncio
 import re
+import functools
+import copy
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+import urllib.request
 from .DLM_Compute_Model import *
 from .DLM_Memory_Model import *
+from .DLM_Router_Model import LocalRouter, log_route, train_router, get_cached_route, evict_routes
+from .DLM_Cache import LRUCache
+from .DLM_Clients import settings as ollama_settings, get_chat_client
+from .DLM_Database import ConnectionPool, get_pool
 from better_profanity import profanity
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage, SystemMessage
+
+def _build_phrase_trie(phrases) -> dict:
+    """
+    Builds a token trie for multi-word phrases, e.g. {"you": {"know": {None: True}}}.
+
+    A None key marks that the tokens leading to that node form a complete phrase.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for token in phrase.split():
+            node = node.setdefault(token, {})
+        node[None] = True
+    return trie
+
+@dataclass(frozen=True)
+class _RequestContext:
+    """
+    Everything DLM knows about the request it is answering.
+
+    A context is never modified: each phase of a request (filtering, routing, computing) continues
+    with an updated copy made by `dataclasses.replace`, so requests running concurrently on one DLM
+    object never see each other's state.
+    """
+    query: str # user-inputted query
+    tone: str = "" # sentimental tone of user query
+    filtered_query: str = "" # query without filler words
+    special_stripped_query: str = "" # query without any special words for reduced interference while vector calculating
+    model: str | None = None # "compute" or "memory" once routed (before that, the previous model of the session)
+    session: object = None # the caller's conversation, or None for the DLM object's own (see `DLM.ask`)
+    computation_state: dict | None = None # final state of the compute engine, if it ran for this request
+    doc_memo: dict = field(default_factory=dict) # text -> document vector memo
+    similarity_memo: dict = field(default_factory=dict) # (query, question) -> vector similarity memo
 
 class DLM:
     """
@@ -29,20 +70,27 @@ class DLM:
     _shared_nlp = None
     _shared_hf = None
     _shared_profanity_loaded = False
-    _shared_router = None
+    _ollama_ready_until = 0.0 # monotonic time until which the last successful Ollama readiness check is trusted
+    _ollama_lock = threading.Lock()
+    _shared_special_vectors = None # unit vectors of the CoT "special_start" words, computed once
 
     __filename = None  # knowledge-base (SQL)
-    __query = None  # user-inputted query
     __nlp = None  # Spacy NLP analysis
-    __tone = None  # sentimental tone of user query
     __mode = None  # either "train_memory", "train_compute", or "apply"
-    __unsure_while_thinking = False  # if uncertain while thinking, then it will let the user know that
-    __nlp_similarity_value = None  # saves the similarity value by doing SpaCy calculation (for debugging)
-    __special_stripped_query = None  # saves query without any special words for reduced interference while vector calculating
-    __refuse_to_respond = False # if profanity and all caps-lock frustration is detected, refuse to respond and suggest user to rephrase nicely
-    __model = None # bot automatically chooses between "compute" or "memory" model based on query type (auto-routing)
     __computation_feedback = ""
-    __computation_state = None
+    __local = None # per-thread state: the database cursor
+    __session_limit = 4096 # conversations whose last routed model is remembered (least recently used ones are forgotten)
+    __model = None # model of the last query asked without a session (the object's own conversation)
+    __fts_enabled = False # whether the SQLite build supports FTS5 for candidate prefiltering
+    __fts_shortlist_size = 50 # number of BM25-ranked candidates scored by sequence matching
+    __fts_min_rows = 5000 # below this many rows, scanning the resident snapshot is cheaper than an FTS query
+    __kb_snapshot = None # resident columnar copy of the knowledge base (see KnowledgeSnapshot)
+
+    # only the static word vectors are ever used, so the trained pipeline components are never loaded
+    __vector_only_exclude = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+
+    __ollama_ready_ttl = 300 # seconds a successful readiness check is reused by every DLM in the process
+    __ollama_boot_timeout = 30 # seconds to keep polling a freshly started Ollama server
 
     # personalized responses to let the user know that the bot doesn't know the answer
     __fallback_responses = [
@@ -163,6 +211,11 @@ class DLM:
         "show", "list", "give", "how", "i"
     ]
 
+    # compiled once per class: constant-time single-word lookups and a token trie for multi-word fillers
+    __filler_tokens = frozenset(word for word in __filler_words if " " not in word)
+    __filler_phrases = _build_phrase_trie(word for word in __filler_words if " " in word)
+    __exception_tokens = frozenset(__exception_fillers)
+
     # response for when user uses profanity and all caps, indicating extreme anger
     __refuse_to_respond_statements = [
         "I understand you may be upset. However, I can't respond to messages expressed in anger. Please rephrase calmly so I can assist you.",
@@ -176,7 +229,7 @@ class DLM:
         "Let's reset. Rephrase your question without the frustration, and I'll be able to help you effectively."
     ]
 
-    def __init__(self, mode, db_filename=None):  # initializes SQL database & SpaCy NLP
+    def __init__(self, mode, db_filename=None, cache_size=1024, cache_ttl=300, parallel_workers=0, parallel_min_rows=20000, routing_cache_size=4096):  # initializes SQL database & SpaCy NLP
         """
         Initializes the DLM engine, loading NLP models, connecting to the knowledge base and compute model database.
 
@@ -186,28 +239,32 @@ class DLM:
                 * 'train_compute': training/correcting the computated answers for validity 
                 * 'apply': No training, for when DLM is production ready (ensure to train well before using this for production applications)
             db_filename (str, optional): Absolute path to the SQLite memory database. Defaults to '~/.dlm/dlm_database.db'.
+            cache_size (int, optional): Maximum number of normalized queries kept in the answer cache (0 disables it). Defaults to 1024.
+            cache_ttl (float, optional): Seconds a cached answer stays valid, or None for no expiry. Defaults to 300.
+            parallel_workers (int, optional): Number of processes used to score the knowledge base in parallel. Defaults to 0 (serial scoring).
+                                              Knowledge bases of at least `parallel_min_rows` rows are then always scored in full
+                                              across the workers, instead of only scoring a BM25 shortlist.
+            parallel_min_rows (int, optional): Knowledge bases smaller than this are always scored serially to avoid IPC overhead. Defaults to 20000.
+            routing_cache_size (int, optional): Number of routing decisions kept in memory in front of the persistent routing cache. Defaults to 4096.
         """
         self.__ensure_ollama_running() # ensure router is running
-        # lazy load SpaCy
+        # lazy load SpaCy (imported here too, so importing dlm stays fast)
         if DLM._shared_nlp is None:
+            import spacy
+
             try:
-                DLM._shared_nlp = spacy.load("en_core_web_lg") # type: ignore
+                DLM._shared_nlp = spacy.load("en_core_web_lg", exclude=DLM.__vector_only_exclude) # type: ignore
             except OSError:
                 print("[SYSTEM]: Downloading required SpaCy NLP model (this will only happen once)...")
                 from spacy.cli import download # type: ignore
                 download("en_core_web_lg") 
-                DLM._shared_nlp = spacy.load("en_core_web_lg")
+                DLM._shared_nlp = spacy.load("en_core_web_lg", exclude=DLM.__vector_only_exclude)
 
         # load profanity filter
         if not DLM._shared_profanity_loaded:
             profanity.load_censor_words()
             DLM._shared_profanity_loaded = True
 
-        # lazy load ollama router
-        if DLM._shared_router is None:
-            DLM._shared_router = ChatOllama(model='llama3.2', base_url='http://localhost:11434')
-        self.__router_llm = DLM._shared_router
-
         self.__nlp = DLM._shared_nlp
 
         if db_filename is None:
@@ -222,28 +279,76 @@ class DLM:
             self.__filename = db_filename
         self.__mode = mode
         self.__computation_feedback = ""
-
-        try:
-            self.__conn = sqlite3.connect(self.__filename, check_same_thread=False)
-            self.__cursor = self.__conn.cursor()
-        except sqlite3.Error as e:
-            print(f"System: Error connecting to database: {e}")
-            self.__conn = None
-            self.__cursor = None
+        self.__answer_cache = LRUCache(cache_size, cache_ttl)
+        self.__route_cache = LRUCache(routing_cache_size)
+        self.__sessions = LRUCache(DLM.__session_limit) # session -> model of its last query (see `__begin`)
+        self.__parallel_scorer = ParallelScorer(parallel_workers) if parallel_workers and parallel_workers > 1 else None
+        self.__parallel_min_rows = parallel_min_rows
+        self.__snapshot_lock = threading.RLock() # serializes loading and refreshing the shared snapshot
+
+        # each thread gets its own pooled connection and cursor (see `__conn`), so one object can serve a thread pool
+        if self.__filename == ":memory:":
+            # a shared-cache URI, so that every thread's connection sees the same in-memory database
+            self.__db = ConnectionPool(f"file:dlm-{id(self)}?mode=memory&cache=shared", uri=True)
+        else:
+            self.__db = get_pool(self.__filename) # shared with every DLM object on the same file
+        self.__local = threading.local()
+        self.__connections = [] # connections this object opened outside the pool
 
         self.__create_table_if_missing()
 
+        # the local router is persisted next to the memory database
+        self.__router_path = None if self.__filename == ":memory:" else self.__filename + ".router.npz"
+        self.__local_router = LocalRouter.load(self.__router_path) if self.__router_path else LocalRouter()
+
     def __del__(self):
         """
-        Destructor: safely closes the database connection when the object is destroyed.
+        Destructor: safely closes the database connections when the object is destroyed.
         """
         try:
-            # we check if the connection attribute exists and is not None
-            if hasattr(self, '_DLM__conn') and self.__conn:
-                self.__conn.close()
+            # the one the snapshot watches for changes (and, for in-memory databases, the whole pool)
+            for conn in getattr(self, '_DLM__connections', []):
+                conn.close()
+            if self.__filename == ":memory:" and getattr(self, '_DLM__db', None) is not None:
+                self.__db.close()
+            if getattr(self, '_DLM__parallel_scorer', None) is not None:
+                self.__parallel_scorer.shutdown()
         except Exception:
             pass  # suppress errors during destruction to prevent noisy exit
 
+    def __connect(self):
+        """
+        Opens a dedicated connection to the memory database, outside the pool.
+
+        Returns:
+            sqlite3.Connection or None: The connection (closed with the DLM object), or None if the database can't be opened.
+        """
+        try:
+            conn = self.__db.open()
+        except sqlite3.Error as e:
+            print(f"System: Error connecting to database: {e}")
+            return None
+
+        self.__connections.append(conn)
+        return conn
+
+    @property
+    def __conn(self):
+        """This thread's pooled connection to the memory database (None if it can't be opened)."""
+        cursor = self.__cursor
+        return cursor.connection if cursor is not None else None
+
+    @property
+    def __cursor(self):
+        """This thread's cursor on the memory database, created on first use (None if the database can't be opened)."""
+        if not hasattr(self.__local, "cursor"):
+            try:
+                self.__local.cursor = self.__db.connection().cursor()
+            except sqlite3.Error as e:
+                print(f"System: Error connecting to database: {e}")
+                self.__local.cursor = None
+        return self.__local.cursor
+
     def __create_table_if_missing(self) -> None:
         """
         Ensures the SQLite 'knowledge_base' table exists and has the required schema.
@@ -258,7 +363,8 @@ class DLM:
                     id          INTEGER PRIMARY KEY AUTOINCREMENT,
                     question    TEXT    NOT NULL UNIQUE,
                     answer      TEXT    NOT NULL,
-                    category    TEXT    NOT NULL
+                    category    TEXT    NOT NULL,
+                    vector      BLOB
                 )
                 """)
 
@@ -271,49 +377,169 @@ class DLM:
                     ADD COLUMN category TEXT NOT NULL DEFAULT ''
                     """)
 
+        if 'vector' not in cols:
+            self.__cursor.execute("ALTER TABLE knowledge_base ADD COLUMN vector BLOB")
+
+        self.__create_fts_index()
+        self.__create_change_log()
+
+        # LLM routing decisions, used as training data for the local router
+        self.__cursor.execute("""
+                CREATE TABLE IF NOT EXISTS routing_log (
+                    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                    query       TEXT    NOT NULL,
+                    route       TEXT    NOT NULL
+                )
+                """)
+
+        # persistent routing decisions per generalized query shape (numbers replaced by [x])
+        self.__cursor.execute("""
+                CREATE TABLE IF NOT EXISTS routing_cache (
+                    generalized_query   TEXT    PRIMARY KEY,
+                    route               TEXT    NOT NULL
+                )
+                """)
         self.__conn.commit()
 
+        # vectorize rows stored before document vectors were saved alongside them
+        backfill_vectors(self)
+
+    def __create_fts_index(self) -> None:
+        """
+        Creates the FTS5 shadow table over 'knowledge_base.question' used for candidate prefiltering.
+
+        Triggers keep the index in sync with every write made by `learn()`, and legacy databases
+        are indexed once when the shadow table is first created. If the SQLite build lacks FTS5,
+        retrieval silently falls back to a full table scan.
+        """
+        assert self.__cursor is not None
+        self.__cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_base_fts'")
+        index_exists = self.__cursor.fetchone() is not None
+
+        try:
+            self.__cursor.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_base_fts
+                    USING fts5(question, content='knowledge_base', content_rowid='id')
+                    """)
+        except sqlite3.OperationalError:
+            self.__fts_enabled = False
+            return
+
+        self.__cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS knowledge_base_fts_insert AFTER INSERT ON knowledge_base BEGIN
+                    INSERT INTO knowledge_base_fts (rowid, question) VALUES (new.id, new.question);
+                END
+                """)
+        self.__cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS knowledge_base_fts_delete AFTER DELETE ON knowledge_base BEGIN
+                    INSERT INTO knowledge_base_fts (knowledge_base_fts, rowid, question) VALUES ('delete', old.id, old.question);
+                END
+                """)
+        self.__cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS knowledge_base_fts_update AFTER UPDATE OF question ON knowledge_base BEGIN
+                    INSERT INTO knowledge_base_fts (knowledge_base_fts, rowid, question) VALUES ('delete', old.id, old.question);
+                    INSERT INTO knowledge_base_fts (rowid, question) VALUES (new.id, new.question);
+                END
+                """)
+
+        # index rows that were stored before the shadow table existed
+        if not index_exists:
+            self.__cursor.execute("INSERT INTO knowledge_base_fts (knowledge_base_fts) VALUES ('rebuild')")
+
+        self.__fts_enabled = True
+
+    def __create_change_log(self) -> None:
+        """
+        Creates the trigger-maintained 'knowledge_base_changes' log that lets every process patch its
+        resident snapshot incrementally instead of re-reading the whole table after a write.
+        """
+        assert self.__cursor is not None
+        self.__cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge_base_changes (
+                    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+                    row_id      INTEGER NOT NULL,
+                    op          TEXT    NOT NULL
+                )
+                """)
+        for op, row in (("insert", "new"), ("update", "new"), ("delete", "old")):
+            self.__cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS knowledge_base_log_{op} AFTER {op.upper()} ON knowledge_base BEGIN
+                        INSERT INTO knowledge_base_changes (row_id, op) VALUES ({row}.id, '{op}');
+                    END
+                    """)
+
+        # keep the log bounded (between 1000 and 2000 rows) however many rows are written between restarts;
+        # a snapshot that falls behind the pruned range simply reloads in full
+        self.__cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS knowledge_base_changes_prune AFTER INSERT ON knowledge_base_changes
+                WHEN new.seq % 1000 = 0 BEGIN
+                    DELETE FROM knowledge_base_changes WHERE seq <= new.seq - 1000;
+                END
+                """)
+        self.__cursor.execute("DELETE FROM knowledge_base_changes WHERE seq <= (SELECT max(seq) FROM knowledge_base_changes) - 1000")
+
     def __ensure_ollama_running(self) -> None: # pyright: ignore[reportSelfClsParameterName]
-        """Silently checks if Ollama is active, and boots it in the background if it is not."""
-        port = 11434
-        host = '127.0.0.1'
-        server_running = False
-
-        # check if the server is already awake
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(1)
-            try:
-                s.connect((host, port))
-                server_running = True
-            except socket.error:
-                pass
-        
-        # boot the server if it was asleep
-        if not server_running:
+        """
+        Silently checks if Ollama is active, and boots it in the background if it is not.
+
+        The result is shared process-wide for `__ollama_ready_ttl` seconds, so constructing more DLM
+        objects doesn't repeat the check. A freshly booted server is polled until it answers instead
+        of waiting a fixed amount of time.
+        """
+        with DLM._ollama_lock:
+            if time.monotonic() < DLM._ollama_ready_until:
+                return
+
+            existing_models = DLM.__ollama_models()
+
+            # boot the server if it was asleep
+            if existing_models is None:
+                try:
+                    subprocess.Popen(
+                        ["ollama", "serve"],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        creationflags=getattr(subprocess, 'DETACHED_PROCESS', 0),
+                        start_new_session=True
+                    )
+                except FileNotFoundError:
+                    print("\n[CRITICAL ERROR]: Ollama is not installed on this system. Please install it from ollama.com to use DLM.")
+                    return
+
+                deadline = time.monotonic() + DLM.__ollama_boot_timeout
+                while existing_models is None and time.monotonic() < deadline:
+                    time.sleep(0.1)
+                    existing_models = DLM.__ollama_models()
+
+                if existing_models is None:
+                    print("\n[SYSTEM]: Ollama did not respond after booting. It will be checked again on the next request.")
+                    return
+
+            # verify the required models exists even if the server was already running
             try:
-                subprocess.Popen(
-                    ["ollama", "serve"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    creationflags=getattr(subprocess, 'DETACHED_PROCESS', 0),
-                    start_new_session=True
-                )
-                time.sleep(3)
+                for model in ollama_settings.required_models():
+                    if model not in existing_models:
+                        print(f"\n[SYSTEM]: Downloading and pulling required Ollama model '{model}'. This may take a few minutes...")
+                        subprocess.run(["ollama", "pull", model], check=True)
             except FileNotFoundError:
                 print("\n[CRITICAL ERROR]: Ollama is not installed on this system. Please install it from ollama.com to use DLM.")
                 return
 
-        # verify the required models exists even if the server was already running
+            DLM._ollama_ready_until = time.monotonic() + DLM.__ollama_ready_ttl
+
+    @staticmethod
+    def __ollama_models() -> str | None:
+        """Returns the names of the locally available Ollama models, or None if the server isn't answering."""
         try:
-            required_models = ["llama3.2", "nomic-embed-text"]
-            existing_models = subprocess.check_output(["ollama", "list"]).decode("utf-8")
+            with urllib.request.urlopen(f"{ollama_settings.base_url}/api/tags", timeout=1) as response:
+                tags = json.loads(response.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+        return " ".join(model.get("name", "") for model in tags.get("models", []))
 
-            for model in required_models:
-                if model not in existing_models:
-                    print(f"\n[SYSTEM]: Downloading and pulling required Ollama model '{model}'. This may take a few minutes...")
-                    subprocess.run(["ollama", "pull", model], check=True)
-        except FileNotFoundError:
-             print("\n[CRITICAL ERROR]: Ollama is not installed on this system. Please install it from ollama.com to use DLM.")
+    def __get_router(self):
+        """Returns the Ollama router LLM from the shared client registry."""
+        return get_chat_client()
 
     def __filtered_input(self, userInput) -> str:
         """
@@ -325,21 +551,50 @@ class DLM:
         Returns:
             str: A filtered version of the input string with filler words removed and duplicates eliminated.
         """
+        return DLM.__normalize(userInput)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def __normalize(userInput) -> str:
+        """
+        Compiled, memoized implementation of `__filtered_input`.
+
+        Single-word fillers are checked against a frozenset and multi-word fillers (e.g. "you know",
+        "as far as i know") are matched longest-first against the phrase trie, so each token costs
+        constant time. Outputs are memoized because the result only depends on the input string.
+        """
         # tokenize user input (split into words)
         words = userInput.lower().split()
 
-        # remove filler words
+        # remove filler words and filler phrases
         filtered_words = []
-        for i, word in enumerate(words):
-            word_lowered = word.lower()
+        i = 0
+        while i < len(words):
+            word = words[i]
 
             # allow exceptions only in first position:
-            if i == 0 and word_lowered in self.__exception_fillers:
+            if i == 0 and word in DLM.__exception_tokens:
                 filtered_words.append(word)
+                i += 1
+                continue
+
+            # skip the longest multi-word filler phrase starting at this word, if any
+            node = DLM.__filler_phrases
+            phrase_end = None
+            j = i
+            while j < len(words) and words[j] in node:
+                node = node[words[j]]
+                j += 1
+                if None in node:
+                    phrase_end = j
+            if phrase_end is not None:
+                i = phrase_end
+                continue
 
             # otherwise, only keep non-fillers
-            elif word_lowered not in self.__filler_words:
+            if word not in DLM.__filler_tokens:
                 filtered_words.append(word)
+            i += 1
 
         # remove duplicates while preserving order (numbers excluded)
         seen = set()
@@ -356,90 +611,93 @@ class DLM:
         # join the remaining words back into a string
         return " ".join(unique_words)
 
-    def __set_sentiment_tone(self, orig_input) -> None:
+    def __sentiment_tone(self, orig_input) -> tuple:
         """
         Analyzes punctuation and profanity to determine the user's emotional state.
 
-        Sets the internal `__tone` variable and triggers the `__refuse_to_respond` flag 
-        if aggressive or highly inappropriate language is detected.
-
         Args:
             orig_input (str): The raw, unaltered user query.
+
+        Returns:
+            tuple: (refuse_to_respond, tone). refuse_to_respond is True if aggressive or highly
+                   inappropriate language is detected (the tone is then None).
         """
         is_profane = profanity.contains_profanity(orig_input)
         if is_profane and orig_input == orig_input.upper(): # too inappropriate to respond
-            self.__refuse_to_respond = True
-        else:
-            self.__refuse_to_respond = False
-            if is_profane:
-                self.__tone = "angry aggressive"
-            elif orig_input == orig_input.upper():
-                self.__tone = "angry frustrated"
-            elif orig_input.__contains__("?") and orig_input.__contains__("!"):
-                self.__tone = "angry confused"
-            elif orig_input.__contains__("!"):
-                self.__tone = "angry excited"
-            elif orig_input.__contains__("?"):
-                self.__tone = "confused unclear"
-            elif orig_input.__contains__("...") or orig_input.__contains__(".."):
-                self.__tone = "doubtful uncertain"
-            else:
-                self.__tone = ""
-
-    def __generate_thought(self, orig_query, filtered_query, best_match_question, best_match_answer, highest_similarity, display_thought) -> None:
+            return True, None
+        if is_profane:
+            return False, "angry aggressive"
+        elif orig_input == orig_input.upper():
+            return False, "angry frustrated"
+        elif orig_input.__contains__("?") and orig_input.__contains__("!"):
+            return False, "angry confused"
+        elif orig_input.__contains__("!"):
+            return False, "angry excited"
+        elif orig_input.__contains__("?"):
+            return False, "confused unclear"
+        elif orig_input.__contains__("...") or orig_input.__contains__(".."):
+            return False, "doubtful uncertain"
+        return False, ""
+
+    def __generate_thought(self, context, best_match_question, best_match_answer, highest_similarity, display_thought, emit=print) -> bool:
         """
         Simulates and captures the Chain-of-Thought (CoT) reasoning process.
 
-        Analyzes tone, extracts context, checks string/vector similarities, and delegates 
-        to the advanced CoT computation engine if routed to the math model. Output is 
-        redirected to a buffer by the caller.
+        Analyzes tone, extracts context, checks string/vector similarities, and explains the
+        result of the advanced CoT computation engine if routed to the math model. Each line of
+        thought is handed to `emit` as soon as it is formed.
 
         Args:
-            filtered_query (str): The cleaned user query.
+            context (_RequestContext): The routed request.
             best_match_question (str): The closest matching question from the database.
             best_match_answer (str): The corresponding database answer.
             highest_similarity (float): The sequence matcher ratio (0.0 to 1.0).
             display_thought (bool): Flag enabling CoT generation.
+            emit (callable, optional): Receives each line of thought (used like `print`).
+
+        Returns:
+            bool: True if, while thinking, it became unsure that the best match answers the query.
         """
+        unsure_while_thinking = False
+        filtered_query = context.filtered_query
         if display_thought:
             if filtered_query is None or filtered_query == "":
-                print(f"I couldn't pick out any context or clear topic. If I see a match in my database I will respond with that, or else I have no clue.")
+                emit(f"I couldn't pick out any context or clear topic. If I see a match in my database I will respond with that, or else I have no clue.")
             else:
-                assert self.__tone is not None
-                sentiment_tone = self.__tone.split()
+                sentiment_tone = context.tone.split()
 
-                if self.__tone != "" and self.__model == "memory":
-                    print(f"Right off the bat, the user seems quite {sentiment_tone[0]} or {sentiment_tone[1]} by their query tone. Hopefully I won't disappoint!")
-                if self.__model == "compute":
-                    # save dict generated by invoking question to compute model
-                    self.__computation_state = dlm_compute_engine.invoke({"query": orig_query}) # type: ignore
-                    route = self.__computation_state.get("route")
-                    formula = self.__computation_state.get("formula", "Unknown")
-                    template = self.__computation_state.get("formula_template", "Unknown")
-                    var_num = self.__computation_state.get("var_num", [])
+                if context.tone != "" and context.model == "memory":
+                    emit(f"Right off the bat, the user seems quite {sentiment_tone[0]} or {sentiment_tone[1]} by their query tone. Hopefully I won't disappoint!")
+                if context.model == "compute":
+                    # the caller already ran the compute model on the query (see `__needs_computation`)
+                    computation_state = context.computation_state or {}
+                    route = computation_state.get("route")
+                    formula = computation_state.get("formula", "Unknown")
+                    template = computation_state.get("formula_template", "Unknown")
+                    var_num = computation_state.get("var_num", [])
 
-                    print("Let me break down the math for this...")
+                    emit("Let me break down the math for this...")
 
-                    if not self.__computation_state or "answer" not in self.__computation_state:
-                        print("I tried to compute the query but I couldn't formulate a valid mathematical expression.")
-                        return
+                    if not computation_state or "answer" not in computation_state:
+                        emit("I tried to compute the query but I couldn't formulate a valid mathematical expression.")
+                        return unsure_while_thinking
 
-                    print(f"First, I extracted the numerical variables from the query: {var_num}")
+                    emit(f"First, I extracted the numerical variables from the query: {var_num}")
 
                     if route == "apply":
-                        print("I searched my computation database and found an exact formula match for this type of problem.")
-                        print(f"I applied the saved template: {template}")
+                        emit("I searched my computation database and found an exact formula match for this type of problem.")
+                        emit(f"I applied the saved template: {template}")
                     else:
-                        print("I didn't have a saved formula for this scenario, so I sent a request to my computation engine to formulate a new one from scratch.")
-                        print(f"It successfully generated the formula: {template}")
+                        emit("I didn't have a saved formula for this scenario, so I sent a request to my computation engine to formulate a new one from scratch.")
+                        emit(f"It successfully generated the formula: {template}")
 
-                    print(f"I plugged the variables into the template to create an expression: {formula}")
-                    calc_answer = str(self.__computation_state.get("answer", ""))
+                    emit(f"I plugged the variables into the template to create an expression: {formula}")
+                    calc_answer = str(computation_state.get("answer", ""))
 
                     if "Error:" in calc_answer:
-                        print("However, when I tried to execute the math, my environment threw an error. I likely lack the specific libraries needed to solve this type of equation.")
+                        emit("However, when I tried to execute the math, my environment threw an error. I likely lack the specific libraries needed to solve this type of equation.")
                     else:
-                        print("I executed the generated formula and I have the answer ready.")
+                        emit("I executed the generated formula and I have the answer ready.")
                 else:
                     interrogative_start = filtered_query.split()[0]
                     identifier = filtered_query
@@ -453,58 +711,63 @@ class DLM:
                     identifier = identifier.split()
 
                     if " ".join(identifier) == "":
-                        print(f"The user starts their query with \"{interrogative_start.title()}\", but I couldn't pick out a clear topic or context.")
+                        emit(f"The user starts their query with \"{interrogative_start.title()}\", but I couldn't pick out a clear topic or context.")
                     else:
-                        print(f"The user starts their query with \"{interrogative_start.title()}\" and they are asking about \"{' '.join(identifier).title()}\".")
-                    print("Let me think about this carefully...")
-
-                    for s in special_start:
-                        for u in filtered_query.split():
-                            s_input = self.__nlp(s) # type: ignore
-                            u_input = self.__nlp(u) # type: ignore
-                            if (s_input.vector_norm != 0 and u_input.vector_norm != 0) and (
-                                    s_input.similarity(u_input) > 0.60):
-                                print(
+                        emit(f"The user starts their query with \"{interrogative_start.title()}\" and they are asking about \"{' '.join(identifier).title()}\".")
+                    emit("Let me think about this carefully...")
+
+                    # one batched pass over the query words, then every (special word, query word) cosine at once
+                    if DLM._shared_special_vectors is None:
+                        DLM._shared_special_vectors = doc_matrix(self, special_start)
+                    query_vectors = doc_matrix(self, filtered_query.split())
+                    similarities = DLM._shared_special_vectors @ query_vectors.T # zero vectors score 0
+
+                    for s, row in zip(special_start, similarities):
+                        for similarity in row:
+                            if similarity > 0.60:
+                                emit(
                                     f"It seems like they want a {s} of \"{' '.join(identifier).title()}\".")
 
-                    is_semantically_similar = self.__semantic_similarity(self.__special_stripped_query, best_match_question)
-                    spacy_proceed = self.__nlp_similarity_value is not None
+                    is_semantically_similar = self.__semantic_similarity(context, context.special_stripped_query, best_match_question)
+                    nlp_similarity_value = context.similarity_memo.get((context.special_stripped_query, best_match_question))
+                    spacy_proceed = nlp_similarity_value is not None
                     if (best_match_answer is None) or (highest_similarity < 0.65 and not is_semantically_similar): # type: ignore
-                        print(
+                        emit(
                             f"The closest match is only {int(highest_similarity * 100)}% similar when I used sequence matching.")
                         if spacy_proceed:
-                            print(
-                                f"Furthermore, an in-depth vector analysis revealed a similarity percentage of {int(self.__nlp_similarity_value * 100)}%.") # type: ignore
-                        print(
+                            emit(
+                                f"Furthermore, an in-depth vector analysis revealed a similarity percentage of {int(nlp_similarity_value * 100)}%.") # type: ignore
+                        emit(
                             f"{'Hmm...' or ''}I don't think I know the answer.")
-                        self.__unsure_while_thinking = True
+                        unsure_while_thinking = True
                     else:
-                        self.__unsure_while_thinking = False
                         DB_identifier = get_specific_question(self, best_match_answer)
-                        print(
+                        emit(
                             f"Yes! I do remember learning about \"{DB_identifier}\" and I might have the right answer!")
-                        print(
+                        emit(
                             f"This is because when I did a sequence similarity calculation to one of the closest match in my database, I found it to be {int(highest_similarity * 100)}% similar.")
                         if spacy_proceed:
-                            print(
-                                f"Additionally, doing a more in-depth vector NLP analysis resulted in {int(self.__nlp_similarity_value * 100)}% similarity. Although there is room for error, we will see.") # type: ignore
-                        print("Let me recall that answer...")
-            print("\n")
+                            emit(
+                                f"Additionally, doing a more in-depth vector NLP analysis resulted in {int(nlp_similarity_value * 100)}% similarity. Although there is room for error, we will see.") # type: ignore
+                        emit("Let me recall that answer...")
+            emit("\n")
+        return unsure_while_thinking
 
-    def __generate_response(self, best_match_answer, best_match_question) -> str:
+    def __generate_response(self, best_match_answer, best_match_question, category=None) -> str:
         """
         Generates a dynamic, human-like response based on the category of the matched answer.
 
         Args:
             best_match_answer (str): The raw answer retrieved from the database.
             best_match_question (str): The original question to provide context for definitions/deadlines.
+            category (str, optional): The already-known category of the question, skipping the database lookup.
 
         Returns:
             str: The formatted response string ready to be delivered to the user.
         """
         clean_answer = best_match_answer.strip().rstrip(".!?")
 
-        identifier = get_category(self, best_match_question)
+        identifier = category if category is not None else get_category(self, best_match_question)
 
         if identifier is None or identifier == "":
             return "Sorry, I encountered an error on my end. Please try again later."
@@ -646,11 +909,14 @@ class DLM:
         else:
             return "Cannot retrieve and generate response due to data in unfamiliar category. Please try again later."
 
-    def __semantic_similarity(self, userInput, knowledgebaseData) -> bool:
+    def __semantic_similarity(self, context, userInput, knowledgebaseData) -> bool:
         """
         Evaluates the semantic meaning between the user's query and a database entry.
 
+        The similarity value is kept in the request's `similarity_memo` under (userInput, knowledgebaseData).
+
         Args:
+            context (_RequestContext): The request whose memos are used.
             userInput (str): The filtered user query.
             knowledgebaseData (str): The question from the database to compare against.
 
@@ -659,14 +925,154 @@ class DLM:
         """
         if userInput is None or knowledgebaseData is None:
             return False
-        UI_doc = self.__nlp(userInput) # type: ignore
-        KB_doc = self.__nlp(knowledgebaseData) # type: ignore
-        if UI_doc.vector_norm != 0 and KB_doc.vector_norm != 0:
-            self.__nlp_similarity_value = UI_doc.similarity(KB_doc)
-            return self.__nlp_similarity_value > 0.75
+
+        # the same pair is checked up to three times per query (retrieval, CoT and final validation)
+        memo_key = (userInput, knowledgebaseData)
+        if memo_key in context.similarity_memo:
+            nlp_similarity_value = context.similarity_memo[memo_key]
+            return nlp_similarity_value is not None and nlp_similarity_value > 0.75
+        context.similarity_memo[memo_key] = None
+
+        UI_vector = doc_vector(self, userInput, context.doc_memo)
+        # stored questions already have a precomputed vector, so only parse them if they aren't indexed
+        KB_vector = get_question_vector(self, knowledgebaseData)
+        if KB_vector is None:
+            KB_vector = doc_vector(self, knowledgebaseData, context.doc_memo)
+        if UI_vector is not None and KB_vector is not None:
+            nlp_similarity_value = float(UI_vector @ KB_vector)
+            context.similarity_memo[memo_key] = nlp_similarity_value
+            return nlp_similarity_value > 0.75
         else:
             return False
         
+    def __refresh_snapshot(self) -> None:
+        """Refreshes the resident knowledge base snapshot and drops cached answers that the changes could affect."""
+        if not self.__cursor:
+            return
+        changed = refresh_snapshot(self)
+        if changed is None:
+            self.__answer_cache.invalidate()
+        elif changed:
+            changed = set(changed)
+            self.__answer_cache.invalidate(lambda key, entry: entry["question"] in changed or entry["similarity"] < 1.0)
+
+    def __find_best_match(self, context) -> tuple:
+        """
+        Searches the knowledge base for the stored question closest to the request's query.
+
+        Args:
+            context (_RequestContext): The filtered request.
+
+        Returns:
+            tuple: (best_match_question, best_match_answer, highest_similarity), where the question and
+                   answer are None if neither sequence matching nor vector similarity found a match.
+        """
+        filtered_query, stripped_query = context.filtered_query, context.special_stripped_query
+
+        # database search over the resident snapshot: opted-in parallel workers score large knowledge bases
+        # in full, otherwise large knowledge bases are shortlisted with BM25 first
+        snapshot = get_snapshot(self)
+        parallel = self.__parallel_scorer is not None and len(snapshot) >= self.__parallel_min_rows
+        rows = []
+        if not parallel and self.__fts_enabled and len(snapshot) >= self.__fts_min_rows:
+            rows = get_candidates(self, (stripped_query, filtered_query), self.__fts_shortlist_size)
+
+        if rows:
+            questions = [question for question, _ in rows]
+            answers = [answer for _, answer in rows]
+            highest_similarity, best_index = best_sequence_match(questions, stripped_query, filtered_query)
+        else:
+            # no shortlist (parallel scoring, FTS5 missing, a small table, or no shared terms): score the whole table
+            questions, answers = snapshot.questions, snapshot.answers
+            if parallel:
+                highest_similarity, best_index = self.__parallel_scorer.score(snapshot, stripped_query, filtered_query)
+            else:
+                highest_similarity, best_index = best_sequence_match(questions, stripped_query, filtered_query)
+
+        best_match_question = questions[best_index] if best_index is not None else None
+        best_match_answer = answers[best_index] if best_index is not None else None
+
+        if highest_similarity < 0.65 and not self.__semantic_similarity(context, stripped_query, best_match_question):
+            best_match_answer = None
+            best_match_question = None
+
+            # a paraphrase can lose on character similarity but still be the closest question by meaning
+            semantic_matches = semantic_top_k(self, stripped_query, k=1, memo=context.doc_memo)
+            if semantic_matches and semantic_matches[0][2] > 0.75:
+                best_match_question, best_match_answer, _ = semantic_matches[0]
+                highest_similarity = max(difflib.SequenceMatcher(None, best_match_question, stripped_query).ratio(),
+                                         difflib.SequenceMatcher(None, best_match_question, filtered_query).ratio())
+
+        return best_match_question, best_match_answer, highest_similarity
+
+    def __route_query(self, context, highest_similarity) -> str | None:
+        """
+        Chooses between the "memory" and "compute" models for the request (HYBRID ROUTING).
+
+        Args:
+            context (_RequestContext): The filtered request.
+            highest_similarity (float): The sequence matcher ratio of the best knowledge base match.
+
+        Returns:
+            str or None: "memory" or "compute" (or the previous model if the mode is unrecognized).
+        """
+        route = self.__route_locally(context, highest_similarity)
+        if route is None and self.__mode == "apply":
+            route_response = self.__get_router().invoke(self.__routing_messages(context.query)).content
+            route = self.__record_route(context.query, route_response)
+        return route
+
+    def __route_locally(self, context, highest_similarity) -> str | None:
+        """
+        The part of `__route_query` that needs no LLM: returns the route, or None when the LLM router must decide.
+        """
+        # three modes, three different ways to handle
+        if self.__mode == "apply":
+            if highest_similarity >= 0.75:
+                return "memory" # bypass the routing since it must be a memory trained query
+
+            # same query shape as an earlier LLM decision (e.g. only the numbers differ)
+            route = get_cached_route(self, context.query)
+            if route is not None:
+                return route
+
+            # the local router answers confidently-classified queries without an LLM round trip
+            return self.__local_router.predict(self.__nlp, context.query)
+
+        elif self.__mode == "train_memory":
+            return "memory"
+        elif self.__mode == "train_compute":
+            return "compute"
+
+        return context.model
+
+    def __routing_messages(self, query) -> list:
+        """Builds the LLM routing prompt for a query."""
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        return [
+            SystemMessage(content=(
+                "You are a strict binary routing script for an AI system.\n"
+                "Categorize the user's query into one of two buckets:\n"
+                "1. COMPUTE: Calculating numbers, math word problems, or unit conversions.\n"
+                "2. MEMORY: Factual information, definitions, yes/no questions, processes, or general knowledge.\n\n"
+                "EXAMPLES:\n"
+                "Q: 'What is the definition of ROS 2?' -> <ROUTE>MEMORY</ROUTE>\n"
+                "Q: 'Add -45.5 and 10' -> <ROUTE>COMPUTE</ROUTE>\n"
+                "Q: 'Can HuggingFace transformers be loaded lazily?' -> <ROUTE>MEMORY</ROUTE>\n"
+                "Q: 'Multiply 0.85 by 12' -> <ROUTE>COMPUTE</ROUTE>\n"
+                "Q: 'What is the process for analyzing a quantum circuit?' -> <ROUTE>MEMORY</ROUTE>\n\n"
+                "Output ONLY the exact XML tag <ROUTE>COMPUTE</ROUTE> or <ROUTE>MEMORY</ROUTE>. Do not output any other text."
+            )),
+            HumanMessage(content=query)
+        ]
+
+    def __record_route(self, query, route_response) -> str:
+        """Parses the LLM router's reply and logs the decision for the routing cache and the local router."""
+        route = "compute" if "<ROUTE>COMPUTE</ROUTE>" in route_response.strip().upper() else "memory"
+        log_route(self, query, route)
+        return route
+
     def teach_memory(self, question, expected_answer, category) -> learn:  # type: ignore
         """
         Public API for training the bot with new question-answer-category triples.
@@ -685,16 +1091,142 @@ class DLM:
         More details in the Github repo README.
         """
         # calls the learn method from memory model file
-        return learn(self, question, expected_answer, category)
+        learned = learn(self, question, expected_answer, category)
+        if learned:
+            # the taught question's answer changed, and it may now outrank any match that wasn't exact
+            self.__answer_cache.invalidate(lambda key, entry: entry["question"] == question or entry["similarity"] < 1.0)
+        return learned
+
+    def teach_memory_bulk(self, records) -> dict:
+        """
+        Public API for training the bot with many question-answer-category triples at once, e.g. a nightly FAQ sync.
+
+        Questions are stored in the form `ask()` looks them up in (lowercased, without filler and special
+        words), which is the form `teach_memory` callers pass from `context["special_stripped_query"]`.
+        All valid records are written in one transaction (existing questions are overwritten, like
+        `teach_memory`), and the knowledge base snapshot and answer cache are rebuilt once at the end.
+        Invalid records are reported instead of aborting the batch.
+
+        Args:
+            records (list or str): Dictionaries with 'question', 'answer' and 'category' keys, or
+                                   (question, answer, category) triples, or the path of a .csv file
+                                   (question,answer,category header) or .jsonl file (one object per line).
+                                   Categories are the same as for `teach_memory`.
+
+        Returns:
+            dict: 'stored' (the number of records written) and 'failed', a list with one
+                  {'row', 'question', 'error'} dictionary per rejected record, where 'row' is the
+                  record's 1-based position (or its line number in a file).
+        """
+        if isinstance(records, (str, os.PathLike)):
+            rows = read_memory_records(records)
+        else:
+            rows = list(enumerate(records, start=1))
+
+        report = learn_many(self, rows, lambda question: self.__strip_query(question)[1])
+        if report["stored"]:
+            self.__answer_cache.invalidate()
+            self.__refresh_snapshot()
+        return report
 
     def teach_compute(self, generalized_query, var_num, corrected_template) -> dict:
         """
         Public API for correcting the computation model's formula.
         Passes the corrected template to the compute engine and recalculates.
         """
+        self.__answer_cache.invalidate(lambda key, entry: entry["model"] == "compute")
         return update_compute_database(generalized_query, var_num, corrected_template)
 
-    def ask(self, query, display_thought) -> dict: 
+    def export_compute_skills(self, path, include_embeddings=False) -> int:
+        """
+        Public API for exporting the learned compute skills, e.g. to seed another deployment.
+
+        Args:
+            path (str): Path of the .jsonl file to write, one {"query_mold", "formula_template"} object per line.
+            include_embeddings (bool): Also write each mold's embedding, so `import_compute_skills` needs
+                                       no embedding requests when both sides use the same embedding model.
+
+        Returns:
+            int: The number of skills exported.
+        """
+        return export_skills(path, include_embeddings)
+
+    def import_compute_skills(self, records) -> dict:
+        """
+        Public API for seeding the computation model with many skills at once.
+
+        Every formula template is checked like a learned one, molds without a precomputed embedding
+        are embedded in batches, and all valid skills are written in one transaction (existing molds
+        are overwritten, like `teach_compute`). Invalid records are reported instead of aborting the batch.
+
+        Args:
+            records (list or str): Dictionaries with 'query_mold' and 'formula_template' keys (and optionally
+                                   'embedding' and 'embed_model'), or (query_mold, formula_template) pairs,
+                                   or the path of a .jsonl file written by `export_compute_skills`.
+
+        Returns:
+            dict: 'imported' (the number of skills written), 'embedded' (how many needed an embedding
+                  request) and 'failed', a list with one {'row', 'query_mold', 'error'} dictionary per
+                  rejected record, where 'row' is the record's 1-based position (or its line number in the file).
+        """
+        if isinstance(records, (str, os.PathLike)):
+            rows = read_skill_records(records)
+        else:
+            rows = list(enumerate(records, start=1))
+
+        report = import_skills(rows)
+        if report["imported"]:
+            self.__answer_cache.invalidate(lambda key, entry: entry["model"] == "compute")
+        return report
+
+    def retrain_router(self) -> dict:
+        """
+        Retrains the local router from logged LLM routing decisions, the knowledge base and the compute
+        skills, then saves it next to the memory database.
+
+        The local router only decides queries it is confident about; the rest still go to the LLM router.
+
+        Returns:
+            dict: 'examples', 'compute' and 'memory' counts, and training 'accuracy' (None if there
+                  wasn't at least one example of each route, in which case nothing is saved).
+        """
+        router = LocalRouter()
+        stats = train_router(self, router)
+        if router.trained:
+            self.__local_router = router
+            if self.__router_path:
+                router.save(self.__router_path)
+        return stats
+
+    def evict_routing_cache(self, query=None) -> int:
+        """
+        Evicts cached routing decisions so that the affected query shapes are routed again.
+
+        Args:
+            query (str, optional): Evict only the decision for this query's generalized shape
+                                   (e.g. "convert 5 km to miles" evicts "convert [x] km to miles").
+                                   If None, the whole routing cache is cleared.
+
+        Returns:
+            int: The number of persisted decisions removed.
+        """
+        return evict_routes(self, query)
+
+    def cache_stats(self) -> dict:
+        """
+        Reports cache effectiveness for tuning `cache_size`, `cache_ttl` and `routing_cache_size`.
+
+        Returns:
+            dict: The 'hits', 'misses', current 'size', 'maxsize' and 'ttl' of the answer cache, with the
+                  same counters for the in-memory routing cache front under 'routing' and for the
+                  in-memory compute embedding cache (shared by every instance) under 'embeddings'.
+        """
+        stats = self.__answer_cache.stats()
+        stats["routing"] = self.__route_cache.stats()
+        stats["embeddings"] = embedding_cache.stats()
+        return stats
+
+    def ask(self, query, display_thought, session=None) -> dict: 
         """
         Process a user query and return a state-signaling dictionary containing the response and reasoning.
 
@@ -707,6 +1239,11 @@ class DLM:
             query (str): The user's question or statement to be processed.
             display_thought (bool): If True, captures the bot's internal Chain-of-Thought (CoT) 
                                     reasoning and includes it in the returned dictionary.
+            session (hashable, optional): Identifies the conversation the query belongs to (e.g. a chat or
+                                          user id). A query is filtered according to the model that answered
+                                          the previous query of its session (punctuation is stripped after a
+                                          memory query). Defaults to None: the DLM object's own conversation,
+                                          shared by every call that names no session.
 
         Returns:
             dict: A structured response containing the following keys:
@@ -727,159 +1264,379 @@ class DLM:
                                 should prompt the user for the correct answer and category, then pass 
                                 those to the `teach()` method.
         """
-        # initialize return schema
-        response_data = {
+        response_data = self.__new_response()
+        context = self.__begin(query, response_data, session=session)
+        if context is None:
+            return response_data
+
+        match = self.__lookup(context)
+        if match[4] is None:
+            match = match[:4] + (self.__route_query(context, match[3]),)
+            self.__remember(context, match)
+        context = replace(context, model=match[4])
+
+        if self.__needs_computation(context, display_thought):
+            context = replace(context, computation_state=get_compute_engine().invoke({"query": context.query})) # type: ignore
+
+        return self.__finish(context, response_data, match, display_thought)
+
+    async def aask(self, query, display_thought, session=None) -> dict:
+        """
+        Asynchronous version of `ask()` with the same arguments and return schema.
+
+        The LLM router, the embedding calls and the compute engine are awaited instead of blocking,
+        and the filtering, knowledge base search and Chain-of-Thought (SQLite and SpaCy work) run in
+        worker threads, so a single event loop can serve many chat sessions at once. Concurrent
+        calls run in parallel, also on the same DLM object; pass each chat's own `session`.
+        """
+        response_data = self.__new_response()
+        context = await asyncio.to_thread(self.__begin, query, response_data, None, session)
+        if context is None:
+            return response_data
+
+        match = await asyncio.to_thread(self.__lookup, context)
+        if match[4] is None:
+            route = await asyncio.to_thread(self.__route_locally, context, match[3])
+            if route is None and self.__mode == "apply":
+                route_response = await self.__get_router().ainvoke(self.__routing_messages(context.query))
+                route = await asyncio.to_thread(self.__record_route, context.query, route_response.content)
+            match = match[:4] + (route,)
+            self.__remember(context, match)
+        context = replace(context, model=match[4])
+
+        if self.__needs_computation(context, display_thought):
+            context = replace(context, computation_state=await get_compute_engine().ainvoke({"query": context.query})) # type: ignore
+
+        return await asyncio.to_thread(self.__finish, context, response_data, match, display_thought)
+
+    def ask_stream(self, query, display_thought=True, session=None):
+        """
+        Streaming version of `ask()`: a generator that yields progress events while the query is
+        processed, so a UI can show progress long before the compute engine finishes.
+
+        Events are dictionaries with a 'type' key:
+            - 'node': a processing step finished ('name' is "lookup" for the knowledge base search, "route"
+                      once the query is routed, or a compute graph node, e.g. "normalize", "check_db",
+                      "llm_reasoning", "compute_answer").
+            - 'token': a piece of LLM output ('text'), with the step that produced it ('node'; "route" for the LLM router).
+            - 'thought': one line of the Chain-of-Thought ('text'), yielded as soon as it is formed, only if display_thought is True.
+            - 'answer': always the last event; 'response' holds the same dictionary `ask()` returns.
+
+        Args:
+            query (str): The user's question or statement to be processed.
+            display_thought (bool, optional): Same as in `ask()`. Defaults to True.
+            session (hashable, optional): Same as in `ask()`.
+        """
+        response_data = self.__new_response()
+        context = self.__begin(query, response_data, session=session)
+        if context is None:
+            yield {"type": "answer", "response": response_data}
+            return
+
+        match = self.__lookup(context)
+        yield {"type": "node", "name": "lookup"}
+        if match[4] is None:
+            route = self.__route_locally(context, match[3])
+            if route is None and self.__mode == "apply":
+                # stream the LLM router's reply, so the round trip shows progress too
+                route_response = ""
+                for chunk in self.__get_router().stream(self.__routing_messages(context.query)):
+                    if chunk.content:
+                        route_response += chunk.content
+                        yield {"type": "token", "text": chunk.content, "node": "route"}
+                route = self.__record_route(context.query, route_response)
+            match = match[:4] + (route,)
+            self.__remember(context, match)
+        yield {"type": "node", "name": "route"}
+        context = replace(context, model=match[4])
+
+        if self.__needs_computation(context, display_thought):
+            computation_state = {}
+            for stream_mode, chunk in get_compute_engine().stream({"query": context.query}, stream_mode=["updates", "messages", "values"]): # type: ignore
+                if stream_mode == "updates":
+                    for node in chunk:
+                        yield {"type": "node", "name": node}
+                elif stream_mode == "messages":
+                    token, metadata = chunk
+                    if token.content:
+                        yield {"type": "token", "text": token.content, "node": metadata.get("langgraph_node")}
+                else:
+                    computation_state = chunk
+            context = replace(context, computation_state=computation_state)
+
+        # the Chain-of-Thought is generated in a worker thread that hands each line over as it is formed
+        thoughts = queue.Queue()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            finished = pool.submit(self.__finish, context, response_data, match, display_thought, thoughts.put)
+            finished.add_done_callback(lambda _: thoughts.put(None))
+            while (thought := thoughts.get()) is not None:
+                if thought.strip():
+                    yield {"type": "thought", "text": thought.strip()}
+            finished.result() # re-raises anything `__finish` raised
+        yield {"type": "answer", "response": response_data}
+
+    def ask_many(self, queries, display_thought=False, max_concurrency=4) -> list:
+        """
+        Answers a batch of queries, e.g. an evaluation set or a bulk FAQ backfill.
+
+        Work is shared across the batch instead of repeated per query: the knowledge base snapshot is
+        refreshed once, all filtered queries are vectorized in one `nlp.pipe` pass, identical queries
+        are answered once, queries with the same normalized form share one routing decision, compute
+        queries are embedded with one batched `embed_documents` call, and the LLM router and compute
+        engine requests run concurrently on a bounded thread pool.
+
+        Args:
+            queries (list): The user queries.
+            display_thought (bool, optional): Same as in `ask()`. Defaults to False.
+            max_concurrency (int, optional): Maximum number of LLM router / compute engine requests in flight. Defaults to 4.
+
+        Returns:
+            list: One `ask()`-style response dictionary per query, in input order.
+        """
+        responses = {}
+        contexts = {} # query -> request context of the queries that weren't refused
+        matches = {}
+
+        # one snapshot and one set of SpaCy memos for the whole batch
+        self.__refresh_snapshot()
+        memos = ({}, {})
+
+        for query in dict.fromkeys(queries):
+            responses[query] = self.__new_response()
+            context = self.__begin(query, responses[query], memos)
+            if context is not None:
+                contexts[query] = context
+
+        prime_doc_vectors(self, [text for context in contexts.values() for text in (context.special_stripped_query, context.filtered_query)], memos[0])
+
+        # knowledge base search and every routing decision that doesn't need the LLM
+        llm_routes = {} # normalized query -> the first query of that form that needs the LLM router
+        for query, context in contexts.items():
+            matches[query] = self.__lookup(context, refresh=False)
+            if matches[query][4] is None:
+                route = self.__route_locally(context, matches[query][3])
+                if route is None and self.__mode == "apply":
+                    llm_routes.setdefault(context.special_stripped_query, query)
+                else:
+                    matches[query] = matches[query][:4] + (route,)
+                    self.__remember(context, matches[query])
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+            router = self.__get_router()
+            replies = pool.map(lambda query: router.invoke(self.__routing_messages(query)).content, llm_routes.values())
+            routes = {stripped: self.__record_route(query, reply) for (stripped, query), reply in zip(llm_routes.items(), replies)}
+
+            to_compute = []
+            for query, context in contexts.items():
+                if matches[query][4] is None:
+                    # only apply-mode queries go to the LLM router; any other undecided route keeps the previous model, as in `ask()`
+                    matches[query] = matches[query][:4] + (routes.get(context.special_stripped_query, context.model),)
+                    self.__remember(context, matches[query])
+                contexts[query] = context = replace(context, model=matches[query][4])
+                if self.__needs_computation(context, display_thought):
+                    to_compute.append(query)
+
+            computations = {}
+            if to_compute:
+                engine = get_compute_engine()
+
+                # embed every query mold the compute engine will search for in one request
+                molds = [normalize_and_extract({"query": query})["generalized_query"] for query in to_compute]
+                unmatched = [mold for mold in dict.fromkeys(molds) if skills_index.exact_template(mold) is None]
+                if unmatched:
+                    embed_texts(unmatched)
+
+                computations = dict(zip(to_compute, pool.map(lambda query: engine.invoke({"query": query}), to_compute)))
+
+        for query, context in contexts.items():
+            if query in computations:
+                context = replace(context, computation_state=computations[query])
+            self.__finish(context, responses[query], matches[query], display_thought)
+
+        # repeated queries get their own copy of the shared response
+        results = []
+        seen = set()
+        for query in queries:
+            results.append(copy.deepcopy(responses[query]) if query in seen else responses[query])
+            seen.add(query)
+        return results
+
+    @staticmethod
+    def __new_response() -> dict:
+        """Returns the empty return schema of `ask()`."""
+        return {
             "status": "resolved",
             "answer": "",
             "thought": "",
             "context": {}
         }
 
-        cot_buffer = io.StringIO()
+    def __begin(self, query, response_data, memos=None, session=None) -> _RequestContext | None:
+        """
+        Starts a request: checks the tone and filters the query.
+
+        Args:
+            memos (tuple, optional): The (document vector, similarity) memos for the request. Defaults to
+                                     fresh ones (`ask_many` shares one pair across its batch).
+            session (hashable, optional): The caller's conversation (see `ask`).
+
+        Returns:
+            _RequestContext or None: The new request's context, or None if `response_data` already holds
+                                     the final (refused) response.
+        """
         answer_buffer = io.StringIO()
 
-        self.__query = query
-        
         # for implementor to handle empty queries
-        if self.__query is None or self.__query.strip() == "":
+        if query is None or query.strip() == "":
             response_data["status"] = "refused"
             response_data["answer"] = "Empty input is unacceptable. Please enter something."
-            return response_data
+            return None
 
         # tone check
-        with contextlib.redirect_stdout(answer_buffer):
-            self.__set_sentiment_tone(self.__query) 
-            if self.__refuse_to_respond:
-                print()
-                print(random.choice(self.__refuse_to_respond_statements))
+        refuse_to_respond, tone = self.__sentiment_tone(query)
+        if refuse_to_respond:
+            print(file=answer_buffer)
+            print(random.choice(self.__refuse_to_respond_statements), file=answer_buffer)
 
         # for implementor to handle 
-        if self.__refuse_to_respond:
+        if refuse_to_respond:
             response_data["status"] = "refused"
             response_data["answer"] = answer_buffer.getvalue()
-            return response_data
+            return None
 
-        # filtering
+        # filtering (punctuation is kept unless the previous query of this session was a memory query)
+        model = self.__sessions.get(session) if session is not None else self.__model
+        filtered_query, special_stripped_query = self.__strip_query(query, model == "memory")
+
+        doc_memo, similarity_memo = memos if memos is not None else ({}, {})
+        return _RequestContext(query, tone, filtered_query, special_stripped_query, model, session=session,
+                               doc_memo=doc_memo, similarity_memo=similarity_memo)
+
+    def __strip_query(self, query, strip_punctuation=False) -> tuple:
+        """
+        Reduces a query to the forms it is matched in.
+
+        Returns:
+            tuple: (filtered_query, special_stripped_query): the lowercased query without filler words, and
+                   that without the special words (e.g. "definition"). Stored questions are in the second form.
+        """
         to_remove = ""
-        if self.__model == "memory":
+        if strip_punctuation:
             to_remove = string.punctuation
 
         translation_table = str.maketrans("", "", to_remove)
-        filtered_query = self.__filtered_input(self.__query.lower().translate(translation_table))
+        filtered_query = self.__filtered_input(query.lower().translate(translation_table))
 
-        self.__special_stripped_query = filtered_query
+        special_stripped_query = filtered_query
         special_exceptions = ["definition", "explanation", "description", "comparison", "calculation", "translation", "meaning"]
         for word in special_exceptions:
-            self.__special_stripped_query = self.__special_stripped_query.replace(word, "")
-        self.__special_stripped_query = " ".join(self.__special_stripped_query.split())
-
-        # database search
-        if self.__cursor:
-            self.__cursor.execute("SELECT question, answer FROM knowledge_base")
-            rows = self.__cursor.fetchall()
-        else:
-            rows = []
-
-        highest_similarity = 0.0
-        best_match_question = None
-        best_match_answer = None
+            special_stripped_query = special_stripped_query.replace(word, "")
+        special_stripped_query = " ".join(special_stripped_query.split())
+        return filtered_query, special_stripped_query
 
-        for stored_question, stored_answer in rows:
-            sim_stripped = difflib.SequenceMatcher(None, stored_question, self.__special_stripped_query).ratio()
-            sim_filtered = difflib.SequenceMatcher(None, stored_question, filtered_query).ratio()
-            sim = max(sim_stripped, sim_filtered)
+    def __lookup(self, context, refresh=True) -> tuple:
+        """
+        Finds the best knowledge base match for the request, from the answer cache when possible.
 
-            if sim > highest_similarity:
-                highest_similarity = sim
-                best_match_question = stored_question
-                best_match_answer = stored_answer
+        Args:
+            refresh (bool): Refresh the knowledge base snapshot first (`ask_many` refreshes it once per batch).
 
-        if highest_similarity < 0.65 and not self.__semantic_similarity(self.__special_stripped_query, best_match_question):
-            best_match_answer = None
-            best_match_question = None
+        Returns:
+            tuple: (question, answer, category, similarity, model), where model is None if the
+                   query wasn't cached and still has to be routed.
+        """
+        # pick up rows written by this or another process since the last query (no I/O if nothing changed)
+        if refresh:
+            self.__refresh_snapshot()
+
+        # answer cache (skips retrieval, vector similarity and LLM routing for repeated queries)
+        cached = self.__answer_cache.get((self.__mode, context.special_stripped_query))
+        if cached is not None:
+            return cached["question"], cached["answer"], cached["category"], cached["similarity"], cached["model"]
+
+        best_match_question, best_match_answer, highest_similarity = self.__find_best_match(context)
+        best_match_category = get_snapshot(self).category_of(best_match_question) if best_match_question is not None else None
+        return best_match_question, best_match_answer, best_match_category, highest_similarity, None
+
+    def __remember(self, context, match) -> None:
+        """Caches a freshly routed (question, answer, category, similarity, model) match for the request's query."""
+        question, answer, category, similarity, model = match
+        self.__answer_cache.put((self.__mode, context.special_stripped_query), {
+            "model": model,
+            "question": question,
+            "answer": answer,
+            "category": category,
+            "similarity": similarity
+        })
+
+    def __needs_computation(self, context, display_thought) -> bool:
+        """Whether the compute model runs for this request (its result is explained in the Chain-of-Thought)."""
+        return bool(display_thought) and context.filtered_query is not None and context.filtered_query != "" and context.model == "compute"
+
+    def __finish(self, context, response_data, match, display_thought, on_thought=None) -> dict:
+        """
+        Generates the Chain-of-Thought and the final answer for a matched and routed request.
 
-        # three modes, three different ways to handle (HYBRID ROUTING)
-        if self.__mode == "apply":
-            if highest_similarity >= 0.75:
-                self.__model = "memory" # bypass the routing since it must be a memory trained query
-            else:
-                routing_msg = [
-                    SystemMessage(content=(
-                        "You are a strict binary routing script for an AI system.\n"
-                        "Categorize the user's query into one of two buckets:\n"
-                        "1. COMPUTE: Calculating numbers, math word problems, or unit conversions.\n"
-                        "2. MEMORY: Factual information, definitions, yes/no questions, processes, or general knowledge.\n\n"
-                        "EXAMPLES:\n"
-                        "Q: 'What is the definition of ROS 2?' -> <ROUTE>MEMORY</ROUTE>\n"
-                        "Q: 'Add -45.5 and 10' -> <ROUTE>COMPUTE</ROUTE>\n"
-                        "Q: 'Can HuggingFace transformers be loaded lazily?' -> <ROUTE>MEMORY</ROUTE>\n"
-                        "Q: 'Multiply 0.85 by 12' -> <ROUTE>COMPUTE</ROUTE>\n"
-                        "Q: 'What is the process for analyzing a quantum circuit?' -> <ROUTE>MEMORY</ROUTE>\n\n"
-                        "Output ONLY the exact XML tag <ROUTE>COMPUTE</ROUTE> or <ROUTE>MEMORY</ROUTE>. Do not output any other text."
-                    )),
-                    HumanMessage(content=self.__query)
-                ]
-
-                route_response = self.__router_llm.invoke(routing_msg).content.strip().upper()
-
-                if "<ROUTE>COMPUTE</ROUTE>" in route_response:
-                    self.__model = "compute"
-                else:
-                    self.__model = "memory"
+        Args:
+            context (_RequestContext): The routed (and, if needed, computed) request.
+            on_thought (callable, optional): Called with each line of thought as it is generated (see `ask_stream`).
+        """
+        best_match_question, best_match_answer, best_match_category, highest_similarity, _ = match
 
-        elif self.__mode == "train_memory":
-            self.__model = "memory"
-        elif self.__mode == "train_compute":
-            self.__model = "compute"
+        cot_buffer = io.StringIO()
+        answer_buffer = io.StringIO()
 
         response_data["context"] = {
-            "special_stripped_query": self.__special_stripped_query,
+            "special_stripped_query": context.special_stripped_query,
             "best_match_answer": best_match_answer
         }
 
+        def emit(text=""):
+            print(text, file=cot_buffer)
+            if on_thought is not None:
+                on_thought(str(text))
+
         # primary model attempt
-        with contextlib.redirect_stdout(cot_buffer):
-            self.__generate_thought(self.__query, filtered_query, best_match_question, best_match_answer, highest_similarity, display_thought)
+        unsure_while_thinking = self.__generate_thought(context, best_match_question, best_match_answer, highest_similarity, display_thought, emit)
 
-        is_valid_match = (not self.__unsure_while_thinking) and ((highest_similarity >= 0.65) or (best_match_answer and self.__semantic_similarity(self.__special_stripped_query, best_match_question)))
+        is_valid_match = (not unsure_while_thinking) and ((highest_similarity >= 0.65) or (best_match_answer and self.__semantic_similarity(context, context.special_stripped_query, best_match_question)))
 
         # resolution & final answer capture
-        with contextlib.redirect_stdout(answer_buffer):
-            if self.__model == "memory":
-                if is_valid_match:
-                    self.__unsure_while_thinking = False
-                    print(self.__generate_response(best_match_answer, best_match_question))
-                    response_data["status"] = "confirm_memory" if self.__mode == "train_memory" else "resolved"
-                else:
-                    if self.__mode == "apply":
-                        print(random.choice(self.__fallback_responses))
-                    response_data["status"] = "needs_teaching" if self.__mode == "train_memory" else "resolved"
+        computation_state = context.computation_state
+        if context.model == "memory":
+            if is_valid_match:
+                print(self.__generate_response(best_match_answer, best_match_question, best_match_category), file=answer_buffer)
+                response_data["status"] = "confirm_memory" if self.__mode == "train_memory" else "resolved"
+            else:
+                if self.__mode == "apply":
+                    print(random.choice(self.__fallback_responses), file=answer_buffer)
+                response_data["status"] = "needs_teaching" if self.__mode == "train_memory" else "resolved"
 
-            elif self.__model == "compute":
-                if self.__computation_state:
-                    response_data["status"] = "confirm_compute" if self.__mode == "train_compute" else "resolved"
+        elif context.model == "compute":
+            if computation_state:
+                response_data["status"] = "confirm_compute" if self.__mode == "train_compute" else "resolved"
 
-                    calc_answer = str(self.__computation_state.get('answer', ''))
-                    if "Error:" in calc_answer:
-                        print(random.choice(self.__fallback_responses))
-                    else:
-                        print(f"The calculated result: {calc_answer}")
-                    
-                    # pack the computation context for the implementor
-                    response_data["context"] = {
-                        "generalized_query": self.__computation_state.get("generalized_query"),
-                        "var_num": self.__computation_state.get("var_num"),
-                        "formula": self.__computation_state.get("formula"),
-                        "answer": self.__computation_state.get("answer")
-                    }
+                calc_answer = str(computation_state.get('answer', ''))
+                if "Error:" in calc_answer:
+                    print(random.choice(self.__fallback_responses), file=answer_buffer)
                 else:
-                    if self.__computation_feedback != "":
-                        print(self.__computation_feedback)
-                        self.__computation_feedback = ""
-                    else:
-                        print(random.choice(self.__fallback_responses))
-                        
-                    response_data["status"] = "needs_teaching" if self.__mode == "train_compute" else "resolved"
+                    print(f"The calculated result: {calc_answer}", file=answer_buffer)
+                
+                # pack the computation context for the implementor
+                response_data["context"] = {
+                    "generalized_query": computation_state.get("generalized_query"),
+                    "var_num": computation_state.get("var_num"),
+                    "formula": computation_state.get("formula"),
+                    "answer": computation_state.get("answer")
+                }
+            else:
+                if self.__computation_feedback != "":
+                    print(self.__computation_feedback, file=answer_buffer)
+                    self.__computation_feedback = ""
+                else:
+                    print(random.choice(self.__fallback_responses), file=answer_buffer)
+                    
+                response_data["status"] = "needs_teaching" if self.__mode == "train_compute" else "resolved"
 
         # extract and clean data
         full_thought = cot_buffer.getvalue()
@@ -891,4 +1648,9 @@ class DLM:
         cot_buffer.close()
         answer_buffer.close()
 
+        # the session's next query is filtered according to this one's model (see `__begin`)
+        if context.session is not None:
+            self.__sessions.put(context.session, context.model)
+        else:
+            self.__model = context.model
         return response_data
\ No newline at end of file
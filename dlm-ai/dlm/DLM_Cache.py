@@ -0,0 +1,86 @@
+import time
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded Least-Recently-Used cache with an optional time-to-live.
+
+    Entries are evicted once the cache holds more than `maxsize` items (oldest access first)
+    or once they are older than `ttl` seconds. Hit and miss counters are kept for tuning.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        Args:
+            maxsize (int): Maximum number of entries kept in memory. 0 disables the cache.
+            ttl (float, optional): Seconds an entry stays valid after it is stored. None means no expiry.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict() # key -> (stored_at, value)
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the cached value for key (marking it as recently used), or default on a miss."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self.__entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value) -> None:
+        """Stores value under key, evicting the least recently used entries beyond maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self.__lock:
+            self.__entries[key] = (time.monotonic(), value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, predicate=None) -> int:
+        """
+        Removes entries from the cache.
+
+        Args:
+            predicate (callable, optional): Called as predicate(key, value); matching entries are removed.
+                                            If None, every entry is removed.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self.__lock:
+            if predicate is None:
+                removed = len(self.__entries)
+                self.__entries.clear()
+                return removed
+
+            stale = [key for key, (_, value) in self.__entries.items() if predicate(key, value)]
+            for key in stale:
+                del self.__entries[key]
+            return len(stale)
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the current and maximum size of the cache."""
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.__entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl
+            }
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,93 @@
+import os
+import threading
+
+def default_base_url() -> str:
+    """Resolves the Ollama server URL from the OLLAMA_HOST environment variable (like the Ollama CLI does)."""
+    host = os.environ.get("OLLAMA_HOST", "").strip() or "127.0.0.1:11434"
+    if "://" not in host:
+        host = "http://" + host
+    # a server bound to every interface is still reached through the loopback address
+    return host.replace("://0.0.0.0", "://127.0.0.1").rstrip("/")
+
+class OllamaSettings:
+    """
+    The one place where DLM's Ollama connection is configured.
+
+    Every chat and embedding client is created from these settings, so pointing DLM at another
+    server or model only needs `configure(...)` (or the OLLAMA_HOST environment variable).
+    """
+
+    def __init__(self, base_url=None, chat_model="llama3.2", embed_model="nomic-embed-text", keep_alive=None):
+        """
+        Args:
+            base_url (str, optional): URL of the Ollama server. Defaults to OLLAMA_HOST, or http://127.0.0.1:11434.
+            chat_model (str): Model used for routing, judging and formula generation.
+            embed_model (str): Model used to embed generalized compute queries.
+            keep_alive (int, optional): Seconds Ollama keeps the models loaded in memory after a request (this is
+                                        model residency, not HTTP keep-alive). Defaults to None: the server's own
+                                        setting (5 minutes unless OLLAMA_KEEP_ALIVE says otherwise).
+        """
+        self.base_url = base_url or default_base_url()
+        self.chat_model = chat_model
+        self.embed_model = embed_model
+        self.keep_alive = keep_alive
+
+    def required_models(self) -> list:
+        """The models that must be pulled before DLM can answer."""
+        return [self.chat_model, self.embed_model]
+
+settings = OllamaSettings()
+
+# (kind, model, base_url) -> client; each client keeps its own pooled keep-alive HTTP connections
+_clients = {}
+_clients_lock = threading.Lock()
+
+def configure(**changes) -> OllamaSettings:
+    """
+    Updates the shared settings (e.g. `configure(base_url="http://gpu-box:11434")`).
+
+    Clients created with the old settings are dropped, so the next request uses the new ones.
+
+    Returns:
+        OllamaSettings: The updated settings.
+    """
+    with _clients_lock:
+        for name, value in changes.items():
+            if not hasattr(settings, name):
+                raise AttributeError(f"Unknown Ollama setting '{name}'.")
+            setattr(settings, name, value)
+        _clients.clear()
+    return settings
+
+def get_chat_client(model=None):
+    """
+    Returns the shared `ChatOllama` client for the model (default: `settings.chat_model`).
+
+    Clients are created once per (model, base_url) and reused by every thread, so requests share
+    the client's pooled HTTP connections instead of opening a new one each time.
+    """
+    model = model or settings.chat_model
+    key = ("chat", model, settings.base_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                from langchain_ollama import ChatOllama
+                client = ChatOllama(model=model, base_url=settings.base_url, keep_alive=settings.keep_alive)
+                _clients[key] = client
+    return client
+
+def get_embedder(model=None):
+    """Returns the shared `OllamaEmbeddings` client for the model (default: `settings.embed_model`)."""
+    model = model or settings.embed_model
+    key = ("embed", model, settings.base_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                from langchain_ollama import OllamaEmbeddings
+                client = OllamaEmbeddings(model=model, base_url=settings.base_url, keep_alive=settings.keep_alive)
+                _clients[key] = client
+    return client
@@ -1,22 +1,37 @@
 import os
+import asyncio
 import regex as re
 import sqlite3
 import json
-import math
-import sympy as sp
+import struct
+import threading
+import numpy as np
 from typing import TypedDict
-from langgraph.graph import StateGraph, END
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_ollama import OllamaEmbeddings
-
-# defining allowed mathematical environments for eval
-allowed_env = {
-        "sp": sp,
-        "x": sp.Symbol('x'),
-        "y": sp.Symbol('y'),
-        "z": sp.Symbol('z'),
-        "t": sp.Symbol('t')}
+from .DLM_Cache import LRUCache
+from .DLM_Clients import settings as ollama_settings, get_chat_client, get_embedder
+from .DLM_Database import get_pool
+
+# sympy, langgraph and the Ollama/LangChain clients are heavy to import, so they are only
+# imported on first use (see get_allowed_env and get_compute_engine)
+_allowed_env = None
+_compute_engine = None
+_db_ready = False
+_lazy_lock = threading.Lock()
+
+def get_allowed_env() -> dict:
+    """Returns the allowed mathematical environment for eval, importing SymPy on first use."""
+    global _allowed_env
+    if _allowed_env is None:
+        import sympy as sp
+
+        # defining allowed mathematical environments for eval
+        _allowed_env = {
+                "sp": sp,
+                "x": sp.Symbol('x'),
+                "y": sp.Symbol('y'),
+                "z": sp.Symbol('z'),
+                "t": sp.Symbol('t')}
+    return _allowed_env
 
 def get_db_path():
     """Creates and returns a newly created DB path at the user's home directory."""
@@ -27,29 +42,387 @@ def get_db_path():
 
 COMPUTE_DB_PATH = get_db_path()
 
+def compute_db() -> sqlite3.Connection:
+    """Returns the calling thread's pooled connection to the compute DB (never closed by callers)."""
+    return get_pool(COMPUTE_DB_PATH).connection()
+
+# binary embedding format: magic, format version, dtype code, reserved, dimensions (+ float32 scale for int8)
+EMBEDDING_MAGIC = b"DLMV"
+EMBEDDING_VERSION = 1
+EMBEDDING_HEADER = struct.Struct("<4sBBHI")
+EMBEDDING_DTYPES = {"float32": (0, np.float32), "float16": (1, np.float16), "int8": (2, np.int8)}
+
+# dtype used for newly written embeddings ("float32", or "float16"/"int8" to trade precision for space)
+EMBEDDING_FORMAT = "float32"
+
+# in-memory tier of the embedding cache; the persistent tier is the 'embedding_cache' table
+embedding_cache = LRUCache(maxsize=4096)
+
+# the persistent tier keeps (between this many and twice this many of) the most recently stored embeddings
+EMBEDDING_CACHE_ROWS = 20000
+
+def encode_embedding(vector, dtype=None) -> bytes:
+    """
+    Serializes an embedding into the compact binary BLOB format stored in 'skills.embedding'.
+
+    Args:
+        vector (list): The embedding values.
+        dtype (str, optional): "float32", "float16" or "int8" (symmetric, per-vector scale). Defaults to EMBEDDING_FORMAT.
+
+    Returns:
+        bytes: The header followed by the packed values.
+    """
+    dtype = dtype or EMBEDDING_FORMAT
+    code, np_dtype = EMBEDDING_DTYPES[dtype]
+    values = np.asarray(vector, dtype=np.float32)
+    header = EMBEDDING_HEADER.pack(EMBEDDING_MAGIC, EMBEDDING_VERSION, code, 0, values.shape[0])
+
+    if dtype == "int8":
+        peak = float(np.abs(values).max()) if values.size else 0.0
+        scale = peak / 127 if peak != 0 else 1.0
+        quantized = np.round(values / scale).astype(np.int8)
+        return header + struct.pack("<f", scale) + quantized.tobytes()
+
+    return header + values.astype(np_dtype).tobytes()
+
+def decode_embedding(value):
+    """
+    Decodes a stored embedding, accepting both the binary BLOB format and legacy JSON text.
+
+    float32 BLOBs are returned as a zero-copy, read-only view of the stored bytes.
+
+    Returns:
+        numpy.ndarray: The embedding as float32 values.
+    """
+    if isinstance(value, str): # legacy JSON column from before the binary format
+        return np.asarray(json.loads(value), dtype=np.float32)
+
+    magic, version, code, _, dims = EMBEDDING_HEADER.unpack_from(value)
+    if magic != EMBEDDING_MAGIC or version != EMBEDDING_VERSION:
+        raise ValueError("Unrecognized embedding format.")
+
+    offset = EMBEDDING_HEADER.size
+    if code == EMBEDDING_DTYPES["float32"][0]:
+        return np.frombuffer(value, dtype=np.float32, count=dims, offset=offset)
+    if code == EMBEDDING_DTYPES["float16"][0]:
+        return np.frombuffer(value, dtype=np.float16, count=dims, offset=offset).astype(np.float32)
+    if code == EMBEDDING_DTYPES["int8"][0]:
+        (scale,) = struct.unpack_from("<f", value, offset)
+        return np.frombuffer(value, dtype=np.int8, count=dims, offset=offset + 4).astype(np.float32) * scale
+    raise ValueError(f"Unknown embedding dtype code {code}.")
+
+def migrate_embeddings(conn, dtype=None) -> int:
+    """
+    One-shot migration of legacy JSON-text embeddings in the 'skills' table to the binary format.
+
+    Rows that are already binary are left untouched, so running it again is a no-op.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the compute DB.
+        dtype (str, optional): Target dtype. Defaults to EMBEDDING_FORMAT.
+
+    Returns:
+        int: The number of rows migrated.
+    """
+    rows = conn.execute("SELECT id, embedding FROM skills WHERE typeof(embedding) = 'text'").fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE skills SET embedding = ? WHERE id = ?",
+            [(encode_embedding(json.loads(embedding), dtype), row_id) for row_id, embedding in rows]
+        )
+        conn.commit()
+    return len(rows)
+
 def setup_db():
     """After creating the DB, this method sets up the DB with column names."""
-    conn = sqlite3.connect(COMPUTE_DB_PATH)
+    global _db_ready
+    conn = compute_db()
     cursor = conn.cursor()
 
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS skills (
             id INTEGER PRIMARY KEY,
             query_mold TEXT,
-            embedding TEXT,
+            embedding BLOB,
             formula_template TEXT
         )
     ''')
+    # verdicts of the veto judge, keyed on the canonical (user query mold, database match) pair
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS judge_verdicts (
+            generalized_query TEXT,
+            best_mold TEXT,
+            verdict INTEGER,
+            PRIMARY KEY (generalized_query, best_mold)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_judge_verdicts_best_mold ON judge_verdicts (best_mold)")
+
+    # embeddings already fetched from Ollama, keyed on (embedding model, text)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            model TEXT,
+            text TEXT,
+            embedding BLOB,
+            PRIMARY KEY (model, text)
+        )
+    ''')
+    # every write gets a new, highest rowid (INSERT OR REPLACE re-inserts), so the oldest embeddings go first
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS embedding_cache_prune AFTER INSERT ON embedding_cache
+        WHEN new.rowid % {EMBEDDING_CACHE_ROWS} = 0 BEGIN
+            DELETE FROM embedding_cache WHERE rowid <= new.rowid - {EMBEDDING_CACHE_ROWS};
+        END
+    ''')
+    cursor.execute(f"DELETE FROM embedding_cache WHERE rowid <= (SELECT max(rowid) FROM embedding_cache) - {EMBEDDING_CACHE_ROWS}")
+    conn.commit()
+
+    # databases created before the binary format still hold JSON text embeddings
+    migrate_embeddings(conn)
+    index_canonical_molds(conn)
+    record_embed_models(conn)
+    track_skills_version(conn)
+    _db_ready = True
+
+# a skill learned (or imported) for an existing canonical mold replaces that row instead of duplicating it
+UPSERT_SKILL_SQL = """
+    INSERT INTO skills (query_mold, embedding, formula_template, canonical_mold, embed_model) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(canonical_mold) DO UPDATE SET
+        query_mold = excluded.query_mold,
+        embedding = excluded.embedding,
+        formula_template = excluded.formula_template,
+        embed_model = excluded.embed_model
+"""
+
+def canonicalize_mold(query_mold: str) -> str:
+    """Canonical form of a query mold used for exact matching: lowercase, single-spaced, no trailing punctuation."""
+    return " ".join(query_mold.lower().split()).strip(" ?.!")
+
+def index_canonical_molds(conn) -> None:
+    """
+    Adds the 'canonical_mold' column and its UNIQUE index to the 'skills' table.
+
+    Legacy databases are backfilled first, and rows sharing a canonical mold are deduplicated by
+    keeping the most recently learned one, so that the UNIQUE index can be created.
+    """
+    cols = [row[1] for row in conn.execute("PRAGMA table_info(skills)")]
+    if 'canonical_mold' not in cols:
+        conn.execute("ALTER TABLE skills ADD COLUMN canonical_mold TEXT")
+
+    rows = conn.execute("SELECT id, query_mold FROM skills WHERE canonical_mold IS NULL").fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE skills SET canonical_mold = ? WHERE id = ?",
+            [(canonicalize_mold(query_mold or ""), row_id) for row_id, query_mold in rows]
+        )
+        conn.execute("""
+            DELETE FROM skills WHERE id NOT IN (SELECT max(id) FROM skills GROUP BY canonical_mold)
+        """)
+
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_skills_canonical_mold ON skills (canonical_mold)")
+    conn.commit()
+
+def record_embed_models(conn) -> None:
+    """
+    Adds the 'embed_model' column that names the embedding model which produced each skill's vector.
+
+    Rows learned before the column existed keep NULL there: their vectors' origin is unknown, so
+    `export_skills` leaves those vectors out.
+    """
+    cols = [row[1] for row in conn.execute("PRAGMA table_info(skills)")]
+    if 'embed_model' not in cols:
+        conn.execute("ALTER TABLE skills ADD COLUMN embed_model TEXT")
+        conn.commit()
+
+def track_skills_version(conn) -> None:
+    """
+    Adds the trigger-maintained 'skills_version' counter that is bumped by every write to 'skills'.
+
+    `SkillsIndex` watches this counter rather than `PRAGMA data_version`, which also moves for the
+    embedding cache and judge verdict writes that share the compute DB.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS skills_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO skills_version (id, version) VALUES (1, 0)")
+    for op in ("insert", "update", "delete"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS skills_version_{op} AFTER {op.upper()} ON skills BEGIN
+                UPDATE skills_version SET version = version + 1 WHERE id = 1;
+            END
+        """)
     conn.commit()
-    conn.close()
 
-def cosine_similarity(vec_1, vec_2):
-    """Calculating the Cosine Similarity."""
-    dot_product = sum(a * b for a, b in zip(vec_1, vec_2))
-    mag1 = math.sqrt(sum(a * a for a in vec_1))
-    mag2 = math.sqrt(sum(b * b for b in vec_2))
-    if mag1 == 0 or mag2 == 0: return 0.0
-    return dot_product / (mag1 * mag2)
+def read_skills_version(cursor) -> int:
+    """Returns the current 'skills_version' counter (read it in the writing transaction to tell `SkillsIndex` about the write)."""
+    return cursor.execute("SELECT version FROM skills_version").fetchone()[0]
+
+def ensure_db() -> None:
+    """Sets up the compute DB once per process, on the first operation that needs it."""
+    if not _db_ready:
+        with _lazy_lock:
+            if not _db_ready:
+                setup_db()
+
+class SkillsIndex:
+    """
+    A resident, L2-normalized float32 matrix of every 'skills' embedding.
+
+    Lookups are a single matrix-vector product instead of decoding and scoring every row in Python.
+    The index is appended to by `llm_reasoning` and patched by `update_compute_database`. When the
+    'skills_version' counter shows that the table was written through another connection, only rows
+    past the highest indexed id are decoded; existing rows just have their templates re-read.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.molds = []
+        self.templates = []
+        self.matrix = None # (rows x dims) float32, built on first use
+        self.exact = {} # canonical mold -> formula template, for the exact-match fast path
+        self.__version = None # the 'skills_version' counter the index was last synced at
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def top_k(self, query_vector, k=1) -> list:
+        """
+        Finds the stored query molds whose embeddings are closest to the query embedding.
+
+        Args:
+            query_vector (list): The embedding of the generalized query.
+            k (int): The number of matches to return.
+
+        Returns:
+            list: (score, query_mold, formula_template) tuples, best first. Ties keep the earliest row.
+        """
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+
+        with self.__lock:
+            self.__sync()
+            if norm == 0 or len(self.ids) == 0 or self.matrix.shape[1] != query.shape[0]:
+                return []
+
+            scores = self.matrix @ (query / norm)
+            k = min(k, len(scores))
+            if k == 1:
+                top = [int(np.argmax(scores))] # the first maximum, so ties keep the earliest row
+            else:
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.lexsort((top, -scores[top]))] # best first, ties by row order
+            return [(float(scores[i]), self.molds[i], self.templates[i]) for i in top]
+
+    def exact_template(self, generalized_query) -> str | None:
+        """Returns the formula template stored for exactly this (canonicalized) query mold, or None."""
+        with self.__lock:
+            self.__sync()
+            return self.exact.get(canonicalize_mold(generalized_query))
+
+    def append(self, row_id, query_mold, embedding, formula_template, version=None) -> None:
+        """
+        Adds a newly learned skill to the index (replacing the row if it is already indexed).
+
+        Args:
+            version (int, optional): The 'skills_version' read right after the write (see `read_skills_version`),
+                                     so that this process's own write doesn't trigger a resync.
+        """
+        with self.__lock:
+            self.__advance(version, 1)
+            self.exact[canonicalize_mold(query_mold)] = formula_template
+            if self.matrix is None:
+                return
+            if row_id in self.ids:
+                self.matrix = None # an upsert replaced an indexed row; rebuild on the next lookup
+                return
+            self.__append([(row_id, query_mold, embedding, formula_template)])
+
+    def update_template(self, query_mold, formula_template, version=None, writes=1) -> None:
+        """
+        Applies a corrected formula template to the indexed row with that (canonicalized) query mold.
+
+        Args:
+            version (int, optional): The 'skills_version' read right after the write, as in `append`.
+            writes (int): The number of 'skills' rows the write changed.
+        """
+        canonical = canonicalize_mold(query_mold)
+        with self.__lock:
+            self.__advance(version, writes)
+            if canonical in self.exact:
+                self.exact[canonical] = formula_template
+            for i, mold in enumerate(self.molds):
+                if canonicalize_mold(mold) == canonical:
+                    self.templates[i] = formula_template
+
+    def reload(self) -> None:
+        """Drops the index so that the next lookup rebuilds it from the database."""
+        with self.__lock:
+            self.matrix = None
+
+    def __advance(self, version, writes) -> None:
+        """Moves the synced version past this process's own write, unless another write came in between."""
+        if version is not None and self.__version is not None and version - writes == self.__version:
+            self.__version = version
+
+    def __sync(self) -> None:
+        """Catches the index up with the database if it was never built or the 'skills' table changed."""
+        ensure_db()
+        conn = compute_db()
+
+        # only writes to 'skills' move the counter (see `track_skills_version`)
+        version = read_skills_version(conn)
+        if self.matrix is not None and version == self.__version:
+            return
+        self.__version = version
+
+        # the exact-match map covers every row, including ones from another embedding model
+        molds = conn.execute("SELECT id, canonical_mold, formula_template FROM skills ORDER BY id").fetchall()
+        self.exact = {row[1]: row[2] for row in molds}
+
+        if self.matrix is not None:
+            # templates of indexed rows may have been corrected elsewhere; re-read them without decoding embeddings
+            last_id = self.ids[-1] if self.ids else 0
+            templates = [(row[0], row[2]) for row in molds if row[0] <= last_id]
+            if [row[0] for row in templates] == self.ids:
+                self.templates = [row[1] for row in templates]
+                rows = conn.execute("SELECT id, query_mold, embedding, formula_template FROM skills WHERE id > ? ORDER BY id", (last_id,)).fetchall()
+                self.__append([(row[0], row[1], decode_embedding(row[2]), row[3]) for row in rows])
+                return
+
+        # first use, or rows were deleted: rebuild from scratch
+        self.ids = []
+        self.molds = []
+        self.templates = []
+        self.matrix = None
+        rows = conn.execute("SELECT id, query_mold, embedding, formula_template FROM skills ORDER BY id").fetchall()
+        self.__append([(row[0], row[1], decode_embedding(row[2]), row[3]) for row in rows])
+
+    def __append(self, rows) -> None:
+        """Appends (id, query_mold, embedding, formula_template) rows, normalizing the embeddings."""
+        if not self.ids:
+            dims = len(rows[-1][2]) if rows else 0 # the newest embedding model decides the dimensions
+            self.matrix = np.zeros((0, dims), dtype=np.float32)
+
+        vectors = []
+        for row_id, query_mold, embedding, formula_template in rows:
+            vector = np.asarray(embedding, dtype=np.float32)
+            if vector.shape[0] != self.matrix.shape[1]: # rows from another embedding model can't be compared
+                continue
+            norm = np.linalg.norm(vector)
+            self.ids.append(row_id)
+            self.molds.append(query_mold)
+            self.templates.append(formula_template)
+            vectors.append(vector / norm if norm != 0 else vector)
+
+        if vectors:
+            self.matrix = np.vstack((self.matrix, np.vstack(vectors)))
+
+# shared by every compute graph invocation in the process
+skills_index = SkillsIndex()
 
 # each state is a node consisting of the following
 class State(TypedDict):
@@ -60,7 +433,8 @@ class State(TypedDict):
     formula: str
     formula_template: str
     answer: str
-    route: str # e.g., "apply" or "learn" or "error"
+    route: str # e.g., "apply" or "learn" or "error" ("search" while the exact-mold lookup misses)
+    query_vector: list # embedding of generalized_query, computed once by check_db and reused by llm_reasoning
 
 def is_safe_formula(formula: str) -> bool:
     """
@@ -97,13 +471,128 @@ def compute_answer(state: State) -> dict:
         return {'answer': "Error: Formula rejected due to potentially malicious or unauthorized syntax."}
 
     try:
-        result = eval(formula, {"__builtins__": {}}, allowed_env)
+        result = eval(formula, {"__builtins__": {}}, get_allowed_env())
         answer = str(result)
     except Exception as e:
         answer = f"Error: {str(e)}"
 
     return {'answer': answer}
 
+def embed_text(text: str, model: str = None):
+    """
+    Returns the embedding of text, asking Ollama only if it isn't cached yet.
+
+    Lookups go through the in-memory LRU tier first, then the persistent 'embedding_cache' table
+    (promoting hits into memory); misses are embedded once and stored in both tiers.
+
+    Args:
+        text (str): The text to embed.
+        model (str, optional): Name of the embedding model, part of the cache key. Defaults to the configured one.
+
+    Returns:
+        numpy.ndarray: The embedding as float32 values.
+    """
+    model = model or ollama_settings.embed_model
+    vector = embedding_cache.get((model, text))
+    if vector is not None:
+        return vector
+
+    vector = read_embedding_cache(model, text)
+    if vector is None:
+        vector = np.asarray(get_embedder(model).embed_query(text), dtype=np.float32)
+        write_embedding_cache(model, text, vector)
+
+    embedding_cache.put((model, text), vector)
+    return vector
+
+def embed_texts(texts: list, model: str = None) -> list:
+    """
+    Batched `embed_text`: every text missing from both cache tiers is embedded in a single
+    `embed_documents` call and persisted in a single transaction.
+
+    Returns:
+        list: One float32 numpy.ndarray per text, in input order.
+    """
+    model = model or ollama_settings.embed_model
+    vectors = {text: embedding_cache.get((model, text)) for text in dict.fromkeys(texts)}
+    missing = [text for text, vector in vectors.items() if vector is None]
+
+    if missing:
+        conn = compute_db()
+        for text in missing:
+            row = conn.execute("SELECT embedding FROM embedding_cache WHERE model = ? AND text = ?", (model, text)).fetchone()
+            if row is not None:
+                vectors[text] = decode_embedding(row[0])
+
+        to_embed = [text for text in missing if vectors[text] is None]
+        if to_embed:
+            embedded = get_embedder(model).embed_documents(to_embed)
+            for text, embedding in zip(to_embed, embedded):
+                vectors[text] = np.asarray(embedding, dtype=np.float32)
+            with conn: # commits, or rolls back so the pooled connection isn't left holding the write lock
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (model, text, embedding) VALUES (?, ?, ?)",
+                    [(model, text, encode_embedding(vectors[text], "float32")) for text in to_embed]
+                )
+
+        for text in missing:
+            embedding_cache.put((model, text), vectors[text])
+
+    return [vectors[text] for text in texts]
+
+async def aembed_text(text: str, model: str = None):
+    """Async `embed_text`: the SQLite tier runs in a worker thread and misses use Ollama's async client."""
+    model = model or ollama_settings.embed_model
+    vector = embedding_cache.get((model, text))
+    if vector is not None:
+        return vector
+
+    vector = await asyncio.to_thread(read_embedding_cache, model, text)
+    if vector is None:
+        vector = np.asarray(await get_embedder(model).aembed_query(text), dtype=np.float32)
+        await asyncio.to_thread(write_embedding_cache, model, text, vector)
+
+    embedding_cache.put((model, text), vector)
+    return vector
+
+def read_embedding_cache(model: str, text: str):
+    """Returns the persisted embedding of text for the model, or None if it was never embedded."""
+    row = compute_db().execute("SELECT embedding FROM embedding_cache WHERE model = ? AND text = ?", (model, text)).fetchone()
+    return decode_embedding(row[0]) if row is not None else None
+
+def write_embedding_cache(model: str, text: str, vector) -> None:
+    """Persists a freshly computed embedding."""
+    # always stored at full precision, regardless of EMBEDDING_FORMAT, so cached and fresh vectors agree
+    with compute_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO embedding_cache (model, text, embedding) VALUES (?, ?, ?)",
+            (model, text, encode_embedding(vector, "float32"))
+        )
+
+def get_verdict(generalized_query: str, best_mold: str) -> bool | None:
+    """Returns the stored veto-judge verdict for the pair (True for YES, False for NO), or None if it was never judged."""
+    row = compute_db().execute(
+        "SELECT verdict FROM judge_verdicts WHERE generalized_query = ? AND best_mold = ?",
+        (canonicalize_mold(generalized_query), canonicalize_mold(best_mold))
+    ).fetchone()
+    return None if row is None else bool(row[0])
+
+def store_verdict(generalized_query: str, best_mold: str, verdict: bool) -> None:
+    """Persists the veto-judge verdict for the pair so that it is never judged again."""
+    with compute_db() as conn:
+        conn.execute(
+            """
+            INSERT INTO judge_verdicts (generalized_query, best_mold, verdict) VALUES (?, ?, ?)
+            ON CONFLICT(generalized_query, best_mold) DO UPDATE SET verdict = excluded.verdict
+            """,
+            (canonicalize_mold(generalized_query), canonicalize_mold(best_mold), int(verdict))
+        )
+
+def invalidate_verdicts(cursor, query_mold: str) -> None:
+    """Forgets every verdict involving the mold, on either side of the pair, after its formula template changed."""
+    canonical = canonicalize_mold(query_mold)
+    cursor.execute("DELETE FROM judge_verdicts WHERE generalized_query = ? OR best_mold = ?", (canonical, canonical))
+
 def update_compute_database(generalized_query: str, var_num: list, corrected_template: str) -> dict:
     """An exposed method for inversion-of-control to update a math formula and recalculate if initial output is inaccurate."""
 
@@ -112,14 +601,17 @@ def update_compute_database(generalized_query: str, var_num: list, corrected_tem
         return {'formula': corrected_template, 'answer': "Error: Formula rejected due to potentially malicious or unauthorized syntax."}
 
     # update the database
-    conn = sqlite3.connect(COMPUTE_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE skills SET formula_template = ? WHERE query_mold = ?", 
-        (corrected_template, generalized_query)
-    )
-    conn.commit()
-    conn.close()
+    ensure_db()
+    with compute_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE skills SET formula_template = ? WHERE canonical_mold = ?", 
+            (corrected_template, canonicalize_mold(generalized_query))
+        )
+        writes = cursor.rowcount
+        version = read_skills_version(cursor)
+        invalidate_verdicts(cursor, generalized_query)
+    skills_index.update_template(generalized_query, corrected_template, version, writes)
 
     # recalculate with the new formula
     formula = corrected_template
@@ -127,99 +619,278 @@ def update_compute_database(generalized_query: str, var_num: list, corrected_tem
         formula = formula.replace(f"[x{i}]", num)
 
     try:
-        answer = str(eval(formula, {"__builtins__": {}}, allowed_env))
+        answer = str(eval(formula, {"__builtins__": {}}, get_allowed_env()))
     except Exception as e:
         answer = f"Error: {str(e)}"
 
     return {"formula": formula, "answer": answer}
 
-def check_database(state: State) -> dict:
+def export_skills(path, include_embeddings=False) -> int:
     """
-    Method to check if compute database contains a similar query/formula when compared to the new query asked.
-    Uses 'generate-and-verify' methodology to prevent hallucination by using a veto judge.
+    Writes every compute skill to a JSONL file, one {"query_mold", "formula_template"} object per line.
+
+    Args:
+        path (str): Path of the file to write.
+        include_embeddings (bool): Also write each mold's "embedding" (with the "embed_model" that
+                                   produced it), so that importing it needs no embedding requests.
+                                   Vectors stored before their model was recorded are left out.
+
+    Returns:
+        int: The number of skills written.
     """
+    ensure_db()
+    rows = compute_db().execute("SELECT query_mold, formula_template, embedding, embed_model FROM skills ORDER BY id").fetchall()
+    with open(path, "w", encoding="utf-8") as file:
+        for query_mold, formula_template, embedding, embed_model in rows:
+            record = {"query_mold": query_mold, "formula_template": formula_template}
+            if include_embeddings and embed_model is not None:
+                record["embedding"] = decode_embedding(embedding).tolist()
+                record["embed_model"] = embed_model
+            file.write(json.dumps(record) + "\n")
+    return len(rows)
 
-    # initialize the embedder and llm (lazy load)
-    llm = ChatOllama(model='llama3.2', base_url='http://localhost:11434')
-    embedder = OllamaEmbeddings(model="nomic-embed-text", base_url="http://localhost:11434")
+def read_skill_records(path) -> list:
+    """
+    Reads compute skills from a JSONL file written by `export_skills`.
 
-    generalized_query = state["generalized_query"]
-    var_num = state["var_num"]
+    Returns:
+        list: (line number, record) pairs, where record is a dict, or the ValueError raised for a
+              line that couldn't be parsed (reported as that row's failure by `import_skills`).
+    """
+    records = []
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append((line_number, json.loads(line)))
+            except ValueError as e:
+                records.append((line_number, ValueError(f"invalid JSON: {e}")))
+    return records
 
-    query_vector = embedder.embed_query(generalized_query)
+def import_skills(rows, batch_size=256) -> dict:
+    """
+    Seeds the 'skills' table from exported (query_mold, formula_template) records in one transaction.
 
-    # creating a specific SQLite database for storing computation model intel, seperate from recall model
-    conn = sqlite3.connect(COMPUTE_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT query_mold, embedding, formula_template FROM skills")
-    rows = cursor.fetchall()
-    conn.close()
+    Every template must pass `is_safe_formula`. Precomputed embeddings are used when their
+    "embed_model" is the configured embedding model; the other molds are embedded in batches of `batch_size`
+    through one `embed_documents` request each (see `embed_texts`), instead of one request per mold.
+    Molds that are already stored are replaced, like a re-learned skill.
 
-    best_score = 0.0
-    best_formula = None
-    best_mold = None
+    Args:
+        rows (list): (label, record) pairs; the label (a line or position number) identifies the record
+                     in the report. A record is a {"query_mold", "formula_template"} dictionary (optionally
+                     with "embedding" and "embed_model"), or a (query_mold, formula_template) pair.
+        batch_size (int): Number of molds per embedding request.
 
-    for row in rows:
-        db_vector = json.loads(row[1])
-        score = cosine_similarity(query_vector, db_vector)
+    Returns:
+        dict: 'imported' (the number of skills stored), 'embedded' (how many of them needed an
+              embedding request) and 'failed' (one {'row', 'query_mold', 'error'} dictionary per
+              record that wasn't stored).
+    """
+    report = {"imported": 0, "embedded": 0, "failed": []}
+    embed_model = ollama_settings.embed_model # every stored vector comes from this model
+    skills = {} # canonical mold -> (label, query_mold, formula_template, embedding or None); the last record wins
 
-        if score > best_score:
-            best_score = score
-            best_formula = row[2] # this is the formula_template from each row
-            best_mold = row[0] # the general query template stored in db
+    for label, record in rows:
+        if isinstance(record, dict):
+            query_mold, formula_template = record.get("query_mold"), record.get("formula_template")
+        elif isinstance(record, (list, tuple)) and len(record) == 2:
+            query_mold, formula_template = record
+            record = {}
+        else:
+            error = str(record) if isinstance(record, Exception) else "expected a query_mold and formula_template"
+            report["failed"].append({"row": label, "query_mold": None, "error": error})
+            continue
 
-    if best_score > 0.85:
-        veto_msg = [SystemMessage(content=(
-            "You are an expert Semantic Routing Judge for a math computation system.\n"
-            "Your objective is to determine if the 'User Query' and the 'Database Match' have the EXACT same core mathematical intent.\n\n"
-            
-            "RULES:\n"
-            "1. Focus ONLY on mathematical verbs (add, subtract, convert) and units/direction (e.g., C to F).\n"
-            "2. The '[x]' tokens represent generic number placeholders.\n"
-            "3. Conversational wrappers ('hey', 'can you', 'please calculate') do NOT change the core mathematical intent.\n"
-            "4. Ignore any differences in capitilization, punctuation, or spelling errors.\n"
-            "5. CRITICAL: The User Query and Database Match MUST have the exact same number of [x] variables. If one has [x][x] and the other has [x], output <verdict>NO</verdict>.\n\n"
-            
-            "OUTPUT FORMAT:\n"
-            "You must output your response strictly using these XML tags:\n"
-            "<analysis> (Write a 1-2 sentence comparison of the core math intent) </analysis>\n"
-            "<verdict> (Output exactly YES or NO) </verdict>\n\n"
-            
-            "EXAMPLES:\n"
-            "User Query: hey dlm, can you add [x] and [x]\n"
-            "Database Match: add [x] and [x]\n"
-            "Output:\n"
-            "<analysis>Both queries intend to perform an addition operation on two numbers. The conversational filler in the User Query does not alter the math.</analysis>\n"
-            "<verdict>YES</verdict>\n\n"
-            
-            "User Query: convert [x] miles to km\n"
-            "Database Match: convert [x] km to miles\n"
-            "Output:\n"
-            "<analysis>The User Query converts miles to kilometers, while the Database Match converts kilometers to miles. The direction is opposite.</analysis>\n"
-            "<verdict>NO</verdict>"
-        )), HumanMessage(content=f"User Query: {generalized_query}\nDatabase Match: {best_mold}")]
+        if not isinstance(query_mold, str) or not canonicalize_mold(query_mold):
+            report["failed"].append({"row": label, "query_mold": query_mold, "error": "missing query_mold"})
+            continue
+        if not isinstance(formula_template, str) or not formula_template.strip():
+            report["failed"].append({"row": label, "query_mold": query_mold, "error": "missing formula_template"})
+            continue
+        if not is_safe_formula(formula_template):
+            report["failed"].append({"row": label, "query_mold": query_mold, "error": "formula rejected due to potentially malicious or unauthorized syntax"})
+            continue
 
-        veto_response = llm.invoke(veto_msg).content.strip()
+        # an embedding from another (or an unnamed) model lives in a different vector space, so it is recomputed
+        embedding = record.get("embedding")
+        if embedding is not None and record.get("embed_model") == embed_model:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            if embedding.ndim != 1 or embedding.size == 0:
+                embedding = None
+        else:
+            embedding = None
 
-        # COMMENT THIS OUT BEFORE PRODUCTION
-        # print(f"\n[JUDGE LOG]:\n{veto_response}\n")
+        skills[canonicalize_mold(query_mold)] = (label, query_mold.strip(), formula_template.strip(), embedding)
 
-        if "<VERDICT>YES</VERDICT>" in veto_response.upper():
-            formula = best_formula
-            for i, num in enumerate(var_num):
-                formula = formula.replace(f"[x{i}]", num) # type: ignore
+    ensure_db()
+    # batched embedding requests for the molds without a usable precomputed embedding
+    pending = [canonical for canonical, skill in skills.items() if skill[3] is None]
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        try:
+            vectors = embed_texts([skills[canonical][1] for canonical in batch], model=embed_model)
+        except Exception as e:
+            for canonical in batch:
+                label, query_mold, _, _ = skills.pop(canonical)
+                report["failed"].append({"row": label, "query_mold": query_mold, "error": f"embedding failed: {e}"})
+            continue
+        for canonical, vector in zip(batch, vectors):
+            skills[canonical] = skills[canonical][:3] + (vector,)
+            report["embedded"] += 1
 
-            # if score is above 0.85 and NO mismatch
-            return {'formula': formula, 'formula_template': best_formula, 'route': 'apply'}
-        else:
-            # print("\n[ROUTER LOG]: Database match vetoed due to directionality mismatch.")
+    if not skills:
+        return report
 
-            # if score is above 0.85 but is a mismatch
-            return {'route': 'learn'}
+    try:
+        with compute_db() as conn:
+            conn.executemany(
+                UPSERT_SKILL_SQL,
+                [(query_mold, encode_embedding(embedding), formula_template, canonical, embed_model)
+                 for canonical, (_, query_mold, formula_template, embedding) in skills.items()]
+            )
+            # verdicts judged against the replaced templates no longer apply
+            conn.executemany(
+                "DELETE FROM judge_verdicts WHERE generalized_query = ? OR best_mold = ?",
+                [(canonical, canonical) for canonical in skills]
+            )
+    except sqlite3.Error as e:
+        print(f"[SYSTEM]: Database Write Error in import_skills: {e}")
+        report["failed"].extend({"row": label, "query_mold": query_mold, "error": str(e)} for label, query_mold, _, _ in skills.values())
+        report["embedded"] = 0
+        return report
 
-    # if score is anyway below 0.85
+    report["imported"] = len(skills)
+    skills_index.reload() # rebuilt once, on the next lookup
+    return report
+
+def check_exact_mold(state: State) -> dict:
+    """
+    Fast path: if the generalized query is (canonically) identical to a stored query mold, apply its
+    formula directly, skipping the embedding call, the similarity search and the veto judge.
+    """
+    formula_template = skills_index.exact_template(state["generalized_query"])
+    if formula_template is None:
+        return {'route': 'search'}
+
+    formula = formula_template
+    for i, num in enumerate(state["var_num"]):
+        formula = formula.replace(f"[x{i}]", num)
+
+    return {'formula': formula, 'formula_template': formula_template, 'route': 'apply'}
+
+def route_exact(state: State) -> str:
+    """Traffic cop after the exact-mold lookup: straight to computing on a hit, otherwise to the similarity search."""
+    if state["route"] == "apply":
+        return "compute_answer"
+    return "check_db"
+
+def judged_route(verdict: bool, best_formula: str, var_num: list) -> dict:
+    """Turns a veto-judge verdict on the best database match into the next graph route."""
+    if verdict:
+        formula = best_formula
+        for i, num in enumerate(var_num):
+            formula = formula.replace(f"[x{i}]", num)
+
+        # if score is above 0.85 and NO mismatch
+        return {'formula': formula, 'formula_template': best_formula, 'route': 'apply'}
+
+    # print("\n[ROUTER LOG]: Database match vetoed due to directionality mismatch.")
+
+    # if score is above 0.85 but is a mismatch
     return {'route': 'learn'}
 
+def veto_messages(generalized_query: str, best_mold: str) -> list:
+    """Builds the veto-judge prompt comparing the user's query mold with its closest database match."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    return [SystemMessage(content=(
+        "You are an expert Semantic Routing Judge for a math computation system.\n"
+        "Your objective is to determine if the 'User Query' and the 'Database Match' have the EXACT same core mathematical intent.\n\n"
+        
+        "RULES:\n"
+        "1. Focus ONLY on mathematical verbs (add, subtract, convert) and units/direction (e.g., C to F).\n"
+        "2. The '[x]' tokens represent generic number placeholders.\n"
+        "3. Conversational wrappers ('hey', 'can you', 'please calculate') do NOT change the core mathematical intent.\n"
+        "4. Ignore any differences in capitilization, punctuation, or spelling errors.\n"
+        "5. CRITICAL: The User Query and Database Match MUST have the exact same number of [x] variables. If one has [x][x] and the other has [x], output <verdict>NO</verdict>.\n\n"
+        
+        "OUTPUT FORMAT:\n"
+        "You must output your response strictly using these XML tags:\n"
+        "<analysis> (Write a 1-2 sentence comparison of the core math intent) </analysis>\n"
+        "<verdict> (Output exactly YES or NO) </verdict>\n\n"
+        
+        "EXAMPLES:\n"
+        "User Query: hey dlm, can you add [x] and [x]\n"
+        "Database Match: add [x] and [x]\n"
+        "Output:\n"
+        "<analysis>Both queries intend to perform an addition operation on two numbers. The conversational filler in the User Query does not alter the math.</analysis>\n"
+        "<verdict>YES</verdict>\n\n"
+        
+        "User Query: convert [x] miles to km\n"
+        "Database Match: convert [x] km to miles\n"
+        "Output:\n"
+        "<analysis>The User Query converts miles to kilometers, while the Database Match converts kilometers to miles. The direction is opposite.</analysis>\n"
+        "<verdict>NO</verdict>"
+    )), HumanMessage(content=f"User Query: {generalized_query}\nDatabase Match: {best_mold}")]
+
+def best_skill(query_vector) -> tuple:
+    """Returns (score, query_mold, formula_template) of the closest stored skill, or (0.0, None, None) for an empty database."""
+    # one matrix product against the resident index of the compute database (seperate from recall model)
+    matches = skills_index.top_k(query_vector, k=1)
+    if matches:
+        return matches[0] # the general query template stored in db and its formula_template
+    return 0.0, None, None
+
+def is_approved(veto_response: str) -> bool:
+    """Whether the veto judge accepted the database match."""
+    return "<VERDICT>YES</VERDICT>" in veto_response.upper()
+
+def check_database(state: State) -> dict:
+    """
+    Method to check if compute database contains a similar query/formula when compared to the new query asked.
+    Uses 'generate-and-verify' methodology to prevent hallucination by using a veto judge.
+    """
+    generalized_query = state["generalized_query"]
+    var_num = state["var_num"]
+
+    query_vector = embed_text(generalized_query)
+    best_score, best_mold, best_formula = best_skill(query_vector)
+
+    if best_score > 0.85:
+        verdict = get_verdict(generalized_query, best_mold)
+        if verdict is None:
+            veto_response = get_chat_client().invoke(veto_messages(generalized_query, best_mold)).content.strip()
+
+            # COMMENT THIS OUT BEFORE PRODUCTION
+            # print(f"\n[JUDGE LOG]:\n{veto_response}\n")
+
+            verdict = is_approved(veto_response)
+            store_verdict(generalized_query, best_mold, verdict)
+        return judged_route(verdict, best_formula, var_num) | {'query_vector': query_vector}
+
+    # if score is anyway below 0.85
+    return {'route': 'learn', 'query_vector': query_vector}
+
+async def acheck_database(state: State) -> dict:
+    """Async `check_database`: awaits Ollama and runs the index and SQLite lookups in worker threads."""
+    generalized_query = state["generalized_query"]
+    var_num = state["var_num"]
+
+    query_vector = await aembed_text(generalized_query)
+    best_score, best_mold, best_formula = await asyncio.to_thread(best_skill, query_vector)
+
+    if best_score > 0.85:
+        verdict = await asyncio.to_thread(get_verdict, generalized_query, best_mold)
+        if verdict is None:
+            veto_response = (await get_chat_client().ainvoke(veto_messages(generalized_query, best_mold))).content.strip()
+            verdict = is_approved(veto_response)
+            await asyncio.to_thread(store_verdict, generalized_query, best_mold, verdict)
+        return judged_route(verdict, best_formula, var_num) | {'query_vector': query_vector}
+
+    return {'route': 'learn', 'query_vector': query_vector}
+
 def route_query(state: State) -> str:
     """Method to help route the query using 'traffic-cop' method."""
     route = state["route"]
@@ -229,24 +900,11 @@ def route_query(state: State) -> str:
     else:
         return "llm_reasoning"
 
-def llm_reasoning(state: State) -> dict:
-    """
-    Uses Ollama LLM to analyze the query and generate a one-line expression to solve it.
+def formula_messages(query: str) -> list:
+    """Builds the prompt asking the LLM to translate the query into a one-line Python expression."""
+    from langchain_core.messages import HumanMessage, SystemMessage
 
-    If query is commpletely new and requires a new formula, a request will be sent to the 
-    compute database to generate and save the new details for next time.
-    """
-
-    # initialize the embedder and llm (lazy load)
-    llm = ChatOllama(model='llama3.2', base_url='http://localhost:11434')
-    embedder = OllamaEmbeddings(model="nomic-embed-text", base_url="http://localhost:11434")
-
-    query = state["query"]
-    generalized_query = state["generalized_query"]
-    var_num = state["var_num"]
-
-    # ask LLM to solve the query
-    msg = [
+    return [
         SystemMessage(content=(
             "You are a Python math translator. Your ONLY job is to write a 1-line Python expression for the user's query.\n"
             "RULES:\n"
@@ -305,9 +963,39 @@ def llm_reasoning(state: State) -> dict:
             "FORMULA: sp.solve(2*x + 5 - 15, x)"
         )), HumanMessage(content=query)
     ]
-    response = llm.invoke(msg)
 
-    raw = response.content
+def llm_reasoning(state: State) -> dict:
+    """
+    Uses Ollama LLM to analyze the query and generate a one-line expression to solve it.
+
+    If query is commpletely new and requires a new formula, a request will be sent to the 
+    compute database to generate and save the new details for next time.
+    """
+    # ask LLM to solve the query
+    response = get_chat_client().invoke(formula_messages(state["query"]))
+
+    # check_db already embedded the generalized query on the way here
+    query_vector = state.get("query_vector")
+    if query_vector is None:
+        query_vector = embed_text(state["generalized_query"])
+
+    return learn_formula(state, response.content, query_vector)
+
+async def allm_reasoning(state: State) -> dict:
+    """Async `llm_reasoning`: awaits the LLM and stores the learned skill from a worker thread."""
+    response = await get_chat_client().ainvoke(formula_messages(state["query"]))
+
+    query_vector = state.get("query_vector")
+    if query_vector is None:
+        query_vector = await aembed_text(state["generalized_query"])
+
+    return await asyncio.to_thread(learn_formula, state, response.content, query_vector)
+
+def learn_formula(state: State, raw: str, query_vector) -> dict:
+    """Extracts the formula from the LLM's reply and saves it as a reusable skill for the query's mold."""
+    generalized_query = state["generalized_query"]
+    var_num = state["var_num"]
+
     formula = raw.split("FORMULA:")[-1].strip() if "FORMULA:" in raw else raw.strip()
 
     formula = formula.replace("```python", "").replace("```", "").strip()
@@ -319,40 +1007,76 @@ def llm_reasoning(state: State) -> dict:
     for i, num in enumerate(var_num):
         formula_temp = formula_temp.replace(num, f"[x{i}]", 1)
 
-    query_vector = embedder.embed_query(generalized_query)
+    with compute_db() as conn:
+        cursor = conn.cursor()
+        # a skill re-learned for the same canonical mold replaces the old row instead of duplicating it
+        canonical_mold = canonicalize_mold(generalized_query)
+        # check_db and llm_reasoning embed with the configured model
+        cursor.execute(UPSERT_SKILL_SQL, (generalized_query, encode_embedding(query_vector), formula_temp, canonical_mold, ollama_settings.embed_model))
+        cursor.execute("SELECT id FROM skills WHERE canonical_mold = ?", (canonical_mold,))
+        row_id = cursor.fetchone()[0]
+        version = read_skills_version(cursor)
+        invalidate_verdicts(cursor, generalized_query) # a re-learned mold may have a different formula now
+    skills_index.append(row_id, generalized_query, query_vector, formula_temp, version)
 
-    conn = sqlite3.connect(COMPUTE_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO skills (query_mold, embedding, formula_template) VALUES (?, ?, ?)",
-                   (generalized_query, json.dumps(query_vector), formula_temp))
+    return {"formula": formula, 'formula_template': formula_temp}
 
-    conn.commit()
-    conn.close()
+def in_thread(node):
+    """Wraps a blocking graph node so that the async engine runs it in a worker thread, off the event loop."""
+    async def run(state: State) -> dict:
+        return await asyncio.to_thread(node, state)
+    return run
 
-    return {"formula": formula, 'formula_template': formula_temp}
+def get_compute_engine():
+    """
+    Returns the compiled LangGraph compute engine, building it (and the compute DB) on first use.
+
+    Building the graph imports LangGraph, so importing this module stays cheap for callers that
+    never compute anything. The engine supports both `invoke()` and `ainvoke()`.
+    """
+    global _compute_engine
+    if _compute_engine is not None:
+        return _compute_engine
+
+    ensure_db()
+    with _lazy_lock:
+        if _compute_engine is not None:
+            return _compute_engine
+
+        from langgraph.graph import StateGraph, END
+        from langchain_core.runnables import RunnableLambda
 
-workflow = StateGraph(State)
+        workflow = StateGraph(State)
 
-# establishing nodes
-workflow.add_node("normalize", normalize_and_extract)
-workflow.add_node("check_db", check_database)
-workflow.add_node("llm_reasoning", llm_reasoning)
-workflow.add_node("compute_answer", compute_answer)
+        # establishing nodes (each has a blocking version for invoke() and a non-blocking one for ainvoke())
+        workflow.add_node("normalize", normalize_and_extract)
+        workflow.add_node("exact_mold", RunnableLambda(check_exact_mold, afunc=in_thread(check_exact_mold)))
+        workflow.add_node("check_db", RunnableLambda(check_database, afunc=acheck_database))
+        workflow.add_node("llm_reasoning", RunnableLambda(llm_reasoning, afunc=allm_reasoning))
+        workflow.add_node("compute_answer", RunnableLambda(compute_answer, afunc=in_thread(compute_answer)))
 
-# draw the edges
-# by setting entry point, the starting node is normalized
-workflow.set_entry_point("normalize")
+        # draw the edges
+        # by setting entry point, the starting node is normalized
+        workflow.set_entry_point("normalize")
 
-# from normalize, it needs to go to check_db to check if the query already exists
-workflow.add_edge("normalize", "check_db")
+        # from normalize, an identical stored mold is applied directly; otherwise check_db searches for a similar one
+        workflow.add_edge("normalize", "exact_mold")
+        workflow.add_conditional_edges("exact_mold", route_exact)
 
-# traffic cop checking
-workflow.add_conditional_edges("check_db", route_query)
+        # traffic cop checking
+        workflow.add_conditional_edges("check_db", route_query)
 
-# connect the rest of the path until the final execution
-workflow.add_edge("llm_reasoning", "compute_answer")
-workflow.add_edge("compute_answer", END)
+        # connect the rest of the path until the final execution
+        workflow.add_edge("llm_reasoning", "compute_answer")
+        workflow.add_edge("compute_answer", END)
 
-setup_db()
+        _compute_engine = workflow.compile()
+    return _compute_engine
 
-dlm_compute_engine = workflow.compile()
+def __getattr__(name):
+    """Keeps the module-level `dlm_compute_engine` and `allowed_env` names working, now built lazily."""
+    if name == "dlm_compute_engine":
+        return get_compute_engine()
+    if name == "allowed_env":
+        return get_allowed_env()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
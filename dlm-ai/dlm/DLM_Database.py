@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import threading
+
+class ConnectionPool:
+    """
+    Pooled, per-thread SQLite connections to one database.
+
+    Every thread gets its own connection (a connection must not run two statements at once), and
+    the connection of a finished thread is handed to the next thread that needs one instead of
+    being reopened. Each connection is tuned for many readers next to an occasional writer:
+        - WAL journaling: readers never block on a writer, and a writer never waits for readers.
+        - synchronous=NORMAL: no fsync on every commit (still durable across crashes in WAL mode).
+        - a busy timeout: a second writer waits for the lock instead of failing with "database is locked".
+        - mmap_size: reads are served from memory-mapped pages instead of read() calls.
+        - a prepared statement cache sized for the handful of queries DLM repeats.
+    """
+
+    def __init__(self, path, uri=False, busy_timeout=5.0, mmap_size=256 * 1024 * 1024, cached_statements=256):
+        """
+        Args:
+            path (str): Path of the database file (or a "file:" URI if uri is True).
+            uri (bool): Whether path is a URI (e.g. a shared-cache in-memory database).
+            busy_timeout (float): Seconds a connection waits for a lock held by another connection.
+            mmap_size (int): Bytes of the database file that are memory-mapped.
+            cached_statements (int): Prepared statements kept per connection.
+        """
+        self.path = path
+        self.uri = uri
+        self.busy_timeout = busy_timeout
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.__local = threading.local()
+        self.__owners = {} # thread -> the connection it holds
+        self.__idle = [] # connections of finished threads, ready to be reused
+        self.__lock = threading.Lock()
+
+    def open(self) -> sqlite3.Connection:
+        """Opens a new, tuned connection that isn't part of the pool (the caller closes it)."""
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout, # sets SQLite's busy timeout
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=self.uri
+        )
+        try:
+            # persistent once set; in-memory databases keep their own journal mode
+            conn.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError:
+            pass # another connection is busy switching it, or holds a lock that outlasts the timeout
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns the calling thread's connection, taking an idle one or opening one on first use."""
+        conn = getattr(self.__local, "conn", None)
+        if conn is None:
+            with self.__lock:
+                for thread in [thread for thread in self.__owners if not thread.is_alive()]:
+                    self.__idle.append(self.__owners.pop(thread))
+                conn = self.__idle.pop() if self.__idle else None
+            if conn is not None and conn.in_transaction:
+                conn.rollback() # whatever the finished thread left uncommitted
+            if conn is None:
+                conn = self.open()
+            with self.__lock:
+                self.__owners[threading.current_thread()] = conn
+            self.__local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Closes every pooled connection (threads that still use the pool get new ones)."""
+        with self.__lock:
+            connections = list(self.__owners.values()) + self.__idle
+            self.__owners.clear()
+            self.__idle.clear()
+        self.__local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def __len__(self) -> int:
+        return len(self.__owners) + len(self.__idle)
+
+# database path -> pool, so every DLM object and module using a database shares its connections
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(path) -> ConnectionPool:
+    """
+    Returns the process-wide connection pool of a database file.
+
+    Args:
+        path (str): Path of the database file, e.g. the memory DB or `COMPUTE_DB_PATH`. In-memory
+                    databases need a pool of their own (see `ConnectionPool`).
+    """
+    path = os.path.abspath(path)
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = ConnectionPool(path)
+                _pools[path] = pool
+    return pool
@@ -1,3 +1,26 @@
+import re
+import csv
+import json
+import difflib
+import sqlite3
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# the answer styles `__generate_response` knows how to phrase
+CATEGORIES = ("yesno", "process", "definition", "deadline", "location", "generic", "eligibility")
+
+# upsert of one knowledge base row, shared by `learn` and `learn_many`
+LEARN_SQL = """
+    INSERT INTO knowledge_base (question, answer, category, vector) 
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(question) DO UPDATE SET 
+        answer = excluded.answer,
+        category = excluded.category,
+        vector = excluded.vector
+"""
+
 def get_category(self, exact_question) -> str | None:  # returns category as a string or None
     """
     Retrieves the category tag for a specific question from the knowledge base.
@@ -75,20 +98,712 @@ def learn(self, question, expectation, category) -> bool:
         return False
 
     try:
-        self._DLM__cursor.execute(
-            """
-            INSERT INTO knowledge_base (question, answer, category) 
-            VALUES (?, ?, ?)
-            ON CONFLICT(question) DO UPDATE SET 
-                answer = excluded.answer,
-                category = excluded.category
-            """,
-            (question, expectation, category)
-        )
+        self._DLM__cursor.execute(LEARN_SQL, (question, expectation, category, encode_vector(doc_vector(self, question))))
 
         self._DLM__conn.commit()
+        if self._DLM__kb_snapshot is not None:
+            self._DLM__kb_snapshot.mark_dirty() # picked up by the next refresh without waiting for data_version
         return True
     
     except Exception as e:
         print(f"[SYSTEM]: Database Write Error in learn: {e}")
-        return False
\ No newline at end of file
+        self._DLM__conn.rollback()
+        return False
+
+def read_memory_records(path) -> list:
+    """
+    Reads knowledge base records from a .csv file (with a question,answer,category header) or a
+    .jsonl file (one {"question": ..., "answer": ..., "category": ...} object per line).
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        list: (line number, record) pairs, where record is a dict, or the ValueError raised for a
+              line that couldn't be parsed (reported as that row's failure by `learn_many`).
+    """
+    path = str(path)
+    records = []
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(file)
+            for record in reader:
+                records.append((reader.line_num, record))
+        elif path.lower().endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append((line_number, json.loads(line)))
+                except ValueError as e:
+                    records.append((line_number, ValueError(f"invalid JSON: {e}")))
+        else:
+            raise ValueError(f"Unsupported knowledge base file '{path}' (expected .csv or .jsonl).")
+    return records
+
+def validate_record(record) -> tuple:
+    """
+    Checks one bulk record and converts it into a (question, answer, category) row.
+
+    Args:
+        record (dict or sequence): {"question", "answer", "category"}, or a (question, answer, category) triple.
+
+    Returns:
+        tuple: The row.
+
+    Raises:
+        ValueError: If the record is malformed or its category is unknown.
+    """
+    if isinstance(record, Exception):
+        raise ValueError(str(record))
+    if isinstance(record, dict):
+        question, answer, category = record.get("question"), record.get("answer"), record.get("category")
+    elif isinstance(record, (list, tuple)) and len(record) == 3:
+        question, answer, category = record
+    else:
+        raise ValueError("expected a question, answer and category")
+
+    if not isinstance(question, str) or not question.strip():
+        raise ValueError("missing question")
+    if not isinstance(answer, str) or not answer.strip():
+        raise ValueError("missing answer")
+    category = category.strip().lower() if isinstance(category, str) else category
+    if category not in CATEGORIES:
+        raise ValueError(f"unknown category {category!r} (expected one of: {', '.join(CATEGORIES)})")
+    return question.strip(), answer.strip(), category
+
+def learn_many(self, rows, normalize=None) -> dict:
+    """
+    Upserts many question-answer-category records in a single transaction.
+
+    Every record is validated first; the valid ones are vectorized in one `nlp.pipe` pass and
+    written with one `executemany`. If SQLite rejects the batch, the rows are retried one by one
+    (still inside the same transaction) so that only the offending rows fail.
+
+    Args:
+        rows (list): (label, record) pairs; the label (a line or position number) identifies the
+                     record in the report. See `validate_record` for the record formats.
+        normalize (callable, optional): Turns each valid question into the form it is stored (and looked up) in.
+
+    Returns:
+        dict: 'stored' (the number of rows written) and 'failed' (one {'row', 'question', 'error'}
+              dictionary per record that wasn't stored).
+    """
+    report = {"stored": 0, "failed": []}
+    valid = []
+    for label, record in rows:
+        try:
+            question, answer, category = validate_record(record)
+            if normalize is not None:
+                question = normalize(question)
+                if not question:
+                    raise ValueError("question has no words left after removing filler words")
+            valid.append((label, (question, answer, category)))
+        except ValueError as e:
+            question = record.get("question") if isinstance(record, dict) else record[0] if isinstance(record, (list, tuple)) and record else None
+            report["failed"].append({"row": label, "question": question, "error": str(e)})
+
+    if not valid:
+        return report
+
+    if not hasattr(self, '_DLM__cursor') or not self._DLM__conn:
+        print("[SYSTEM]: Error - Cannot learn, database connection lost.")
+        report["failed"].extend({"row": label, "question": row[0], "error": "database connection lost"} for label, row in valid)
+        return report
+
+    # one batched SpaCy pass for every question (zero rows are questions without a vector)
+    matrix = doc_matrix(self, [row[0] for _, row in valid])
+    params = [row + (encode_vector(vector if vector.any() else None),) for (_, row), vector in zip(valid, matrix)]
+
+    invalid = list(report["failed"])
+    cursor = self._DLM__cursor
+    try:
+        cursor.execute("BEGIN")
+        try:
+            cursor.executemany(LEARN_SQL, params)
+            report["stored"] = len(params)
+        except sqlite3.Error:
+            # find the rows SQLite rejects, keeping the others in the same transaction
+            for (label, row), values in zip(valid, params):
+                cursor.execute("SAVEPOINT learn_row")
+                try:
+                    cursor.execute(LEARN_SQL, values)
+                    report["stored"] += 1
+                except sqlite3.Error as e:
+                    cursor.execute("ROLLBACK TO learn_row")
+                    report["failed"].append({"row": label, "question": row[0], "error": str(e)})
+                cursor.execute("RELEASE learn_row")
+        self._DLM__conn.commit()
+    except sqlite3.Error as e:
+        print(f"[SYSTEM]: Database Write Error in learn_many: {e}")
+        self._DLM__conn.rollback()
+        report["failed"] = invalid + [{"row": label, "question": row[0], "error": str(e)} for label, row in valid]
+        report["stored"] = 0
+        return report
+
+    if self._DLM__kb_snapshot is not None:
+        self._DLM__kb_snapshot.mark_dirty()
+    return report
+
+def get_candidates(self, queries, limit=50) -> list:
+    """
+    Retrieves a BM25-ranked shortlist of knowledge base rows sharing at least one term with the queries.
+
+    Args:
+        queries (iterable): The query variants (e.g., filtered and special-stripped) to match against.
+        limit (int): The maximum number of candidate rows to return.
+
+    Returns:
+        list: (question, answer) tuples ordered from best to worst BM25 rank, or an empty list.
+    """
+    if not hasattr(self, '_DLM__cursor') or not self._DLM__cursor:
+        return []
+
+    terms = []
+    for query in queries:
+        for term in re.findall(r"\w+", query or ""):
+            if term not in terms:
+                terms.append(term)
+
+    if not terms:
+        return []
+
+    # quote every term so FTS5 never interprets user text as query syntax (AND, NEAR, *, etc.)
+    match_expr = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+    try:
+        self._DLM__cursor.execute(
+            """
+            SELECT kb.question, kb.answer
+            FROM knowledge_base_fts
+            JOIN knowledge_base AS kb ON kb.id = knowledge_base_fts.rowid
+            WHERE knowledge_base_fts MATCH ?
+            ORDER BY bm25(knowledge_base_fts)
+            LIMIT ?
+            """,
+            (match_expr, limit)
+        )
+        return self._DLM__cursor.fetchall()
+
+    except sqlite3.Error as e:
+        print(f"[SYSTEM]: Database Read Error in get_candidates: {e}")
+        return []
+
+
+def doc_vector(self, text, memo=None):
+    """
+    Computes the L2-normalized SpaCy document vector for a piece of text.
+
+    Args:
+        text (str): The text to vectorize.
+        memo (dict, optional): The request's text -> vector memo, so a query is only parsed once
+                               however often it is compared.
+
+    Returns:
+        numpy.ndarray or None: A float32 unit vector, or None if SpaCy knows none of the words.
+    """
+    if not text or not hasattr(self, '_DLM__nlp') or self._DLM__nlp is None:
+        return None
+
+    if memo is not None and text in memo:
+        return memo[text]
+
+    doc = self._DLM__nlp(text)
+    vector = (doc.vector / doc.vector_norm).astype(np.float32) if doc.vector_norm != 0 else None
+    if memo is not None:
+        memo[text] = vector
+    return vector
+
+def doc_matrix(self, texts):
+    """
+    Computes L2-normalized SpaCy document vectors for many texts in one batched `nlp.pipe` pass.
+
+    Args:
+        texts (list): The texts to vectorize.
+
+    Returns:
+        numpy.ndarray: A (len(texts) x dims) float32 matrix; texts without known words get a zero row.
+    """
+    dims = self._DLM__nlp.vocab.vectors_length
+    matrix = np.zeros((len(texts), dims), dtype=np.float32)
+    for i, doc in enumerate(self._DLM__nlp.pipe(texts)):
+        if doc.vector_norm != 0:
+            matrix[i] = doc.vector / doc.vector_norm
+    return matrix
+
+def prime_doc_vectors(self, texts, memo) -> None:
+    """
+    Fills a document vector memo for many texts with one batched `nlp.pipe` pass, so that later
+    `doc_vector` calls on them are memo hits.
+
+    Args:
+        texts (list): The texts that are about to be vectorized.
+        memo (dict): The text -> vector memo to fill (see `doc_vector`).
+    """
+    pending = [text for text in dict.fromkeys(texts) if text and text not in memo]
+    for text, doc in zip(pending, self._DLM__nlp.pipe(pending)):
+        memo[text] = (doc.vector / doc.vector_norm).astype(np.float32) if doc.vector_norm != 0 else None
+
+def encode_vector(vector) -> bytes:
+    """Serializes a unit vector for the 'knowledge_base.vector' column (empty bytes mean 'no vector')."""
+    if vector is None:
+        return b""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+def backfill_vectors(self) -> int:
+    """
+    Computes and stores document vectors for knowledge base rows saved before vectors existed.
+
+    Returns:
+        int: The number of rows that were vectorized.
+    """
+    if not hasattr(self, '_DLM__cursor') or not self._DLM__cursor or self._DLM__nlp is None:
+        return 0
+
+    self._DLM__cursor.execute("SELECT id, question FROM knowledge_base WHERE vector IS NULL")
+    rows = self._DLM__cursor.fetchall()
+    if not rows:
+        return 0
+
+    updates = []
+    for (row_id, _), doc in zip(rows, self._DLM__nlp.pipe(question for _, question in rows)):
+        vector = (doc.vector / doc.vector_norm).astype(np.float32) if doc.vector_norm != 0 else None
+        updates.append((encode_vector(vector), row_id))
+
+    self._DLM__cursor.executemany("UPDATE knowledge_base SET vector = ? WHERE id = ?", updates)
+    self._DLM__conn.commit()
+    return len(updates)
+
+class _ChangeTracker:
+    """
+    Decides when a knowledge base snapshot has to go back to the database.
+
+    One tracker is shared by every generation of a snapshot. It watches `PRAGMA data_version` on a
+    connection of its own: data_version only moves for commits made by *other* connections, so a
+    dedicated connection sees the commits of every thread's connection, this process's included.
+    """
+
+    def __init__(self, conn=None):
+        """
+        Args:
+            conn (sqlite3.Connection, optional): The connection to watch. If None, the data_version
+                                                 of the refreshing cursor's connection is used.
+        """
+        self.conn = conn
+        self.lock = threading.Lock() # one refresh at a time, so every generation builds on the latest
+        self.dirty = True
+        self.__data_version = None
+
+    def changed(self, cursor) -> bool:
+        """Whether anything may have been committed since the last call (call with `lock` held)."""
+        conn = self.conn if self.conn is not None else cursor.connection
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self.dirty or data_version != self.__data_version
+        self.__data_version = data_version
+        self.dirty = False
+        return changed
+
+class KnowledgeSnapshot:
+    """
+    A resident, columnar copy of the 'knowledge_base' table.
+
+    Each column is held in its own list (plus one float32 matrix for the document vectors) so that
+    retrieval never touches SQLite. The snapshot only goes back to the database when
+    `PRAGMA data_version` shows a commit, or when this process wrote through `learn()`; it then
+    replays the trigger-maintained change log past its high-water mark instead of re-reading the
+    whole table.
+
+    A snapshot is never modified once it is published: a refresh that finds changes returns a new
+    snapshot (copy-on-write), so requests running on other threads keep reading a consistent one.
+    """
+    # above this many pending changes it is cheaper to reload the table than to patch rows one by one
+    max_incremental_changes = 500
+
+    def __init__(self, dims, conn=None):
+        """
+        Args:
+            dims (int): Length of the SpaCy document vectors.
+            conn (sqlite3.Connection, optional): A connection reserved for change detection (see `_ChangeTracker`).
+        """
+        self.dims = dims
+        self.ids = []
+        self.questions = []
+        self.answers = []
+        self.categories = []
+        self.matrix = np.zeros((0, dims), dtype=np.float32)
+        self.positions = {} # question -> column index
+        self.__id_positions = {} # row id -> column index
+        self.__tracker = _ChangeTracker(conn)
+        self.__change_seq = 0 # high-water mark into 'knowledge_base_changes'
+        self.version = 0 # bumped on every change so derived structures (e.g. scoring pools) know to rebuild
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def mark_dirty(self) -> None:
+        """Forces the next refresh to check the change log, even if data_version hasn't moved yet."""
+        self.__tracker.dirty = True
+
+    def category_of(self, question) -> str | None:
+        """Returns the stored category of an exact question, or None if it isn't in the snapshot."""
+        position = self.positions.get(question)
+        return self.categories[position] if position is not None else None
+
+    def vector_of(self, question):
+        """Returns the stored unit vector of an exact question, or None if it isn't indexed."""
+        position = self.positions.get(question)
+        if position is None:
+            return None
+        vector = self.matrix[position]
+        return vector if vector.any() else None
+
+    def refresh(self, cursor) -> tuple:
+        """
+        Brings the knowledge base up to date with the database if anything changed since the last refresh.
+
+        Args:
+            cursor (sqlite3.Cursor): A cursor to read the changes with.
+
+        Returns:
+            tuple: (snapshot, changed). `snapshot` is the snapshot to use from now on: this one if
+                   nothing changed, otherwise a new, updated copy. `changed` lists the questions that
+                   changed (old and new text), is empty if nothing changed, or None if the whole
+                   table had to be reloaded.
+        """
+        with self.__tracker.lock:
+            if not self.__tracker.changed(cursor):
+                return self, []
+
+            cursor.execute("SELECT min(seq), max(seq) FROM knowledge_base_changes")
+            min_seq, max_seq = cursor.fetchone()
+            if max_seq is None or max_seq <= self.__change_seq:
+                return self, []
+
+            # the log was pruned past our high-water mark, or too much changed to patch cheaply
+            if min_seq > self.__change_seq + 1 or max_seq - self.__change_seq > self.max_incremental_changes:
+                return self.reload(cursor), None
+
+            cursor.execute(
+                "SELECT row_id, op FROM knowledge_base_changes WHERE seq > ? AND seq <= ? ORDER BY seq",
+                (self.__change_seq, max_seq)
+            )
+            changes = cursor.fetchall()
+            if any(op == "delete" for _, op in changes):
+                return self.reload(cursor), None
+
+            row_ids = list(dict.fromkeys(row_id for row_id, _ in changes))
+            cursor.execute(
+                f"SELECT id, question, answer, category, vector FROM knowledge_base WHERE id IN ({','.join('?' * len(row_ids))})",
+                row_ids
+            )
+            rows = cursor.fetchall()
+            if len(rows) != len(row_ids):
+                return self.reload(cursor), None
+
+            snapshot = self.__copy()
+            changed = []
+            appended = []
+            for row_id, question, answer, category, blob in rows:
+                position = snapshot.__id_positions.get(row_id)
+                changed.append(question)
+                if position is None:
+                    appended.append((row_id, question, answer, category, blob))
+                    continue
+
+                old_question = snapshot.questions[position]
+                if old_question != question:
+                    changed.append(old_question)
+                    del snapshot.positions[old_question]
+                    snapshot.positions[question] = position
+                snapshot.questions[position] = question
+                snapshot.answers[position] = answer
+                snapshot.categories[position] = category
+                snapshot.matrix[position] = snapshot.__decode(blob)
+
+            if appended:
+                snapshot.__append(appended)
+
+            snapshot.__change_seq = max_seq
+            return snapshot, changed
+
+    def reload(self, cursor):
+        """Returns a new snapshot rebuilt from a full read of the 'knowledge_base' table."""
+        # read the high-water mark first, so a write racing with the full read is replayed next time
+        cursor.execute("SELECT coalesce(max(seq), 0) FROM knowledge_base_changes")
+        change_seq = cursor.fetchone()[0]
+
+        cursor.execute("SELECT id, question, answer, category, vector FROM knowledge_base ORDER BY id")
+        rows = cursor.fetchall()
+
+        snapshot = KnowledgeSnapshot(self.dims)
+        snapshot.__tracker = self.__tracker
+        snapshot.__append(rows)
+        snapshot.__change_seq = change_seq
+        snapshot.version = self.version + 1
+        return snapshot
+
+    def __copy(self):
+        """Returns a copy whose columns can be patched without affecting this (published) snapshot."""
+        snapshot = KnowledgeSnapshot(self.dims)
+        snapshot.ids = list(self.ids)
+        snapshot.questions = list(self.questions)
+        snapshot.answers = list(self.answers)
+        snapshot.categories = list(self.categories)
+        snapshot.matrix = self.matrix.copy()
+        snapshot.positions = dict(self.positions)
+        snapshot.__id_positions = dict(self.__id_positions)
+        snapshot.__tracker = self.__tracker
+        snapshot.__change_seq = self.__change_seq
+        snapshot.version = self.version + 1
+        return snapshot
+
+    def __append(self, rows) -> None:
+        """Appends (id, question, answer, category, vector) rows to the columns."""
+        vectors = np.zeros((len(rows), self.dims), dtype=np.float32)
+        for i, (row_id, question, answer, category, blob) in enumerate(rows):
+            position = len(self.questions)
+            self.ids.append(row_id)
+            self.questions.append(question)
+            self.answers.append(answer)
+            self.categories.append(category)
+            self.positions[question] = position
+            self.__id_positions[row_id] = position
+            vectors[i] = self.__decode(blob)
+        self.matrix = np.vstack((self.matrix, vectors)) if len(self.matrix) else vectors
+
+    def __decode(self, blob):
+        """Decodes a stored vector; empty blobs or vectors from a different model decode to a zero row that never scores."""
+        if blob and len(blob) == self.dims * 4:
+            return np.frombuffer(blob, dtype=np.float32)
+        return np.zeros(self.dims, dtype=np.float32)
+
+def get_snapshot(self) -> KnowledgeSnapshot:
+    """
+    Returns the DLM instance's current knowledge base snapshot, creating and loading it on first use.
+
+    The snapshot is refreshed explicitly once per query by the caller (see `refresh_snapshot`), so
+    repeated lookups within a query never touch the database. Callers that read several columns
+    should fetch the snapshot once and read them all from it.
+    """
+    snapshot = self._DLM__kb_snapshot
+    if snapshot is None:
+        with self._DLM__snapshot_lock:
+            if self._DLM__kb_snapshot is None:
+                dims = self._DLM__nlp.vocab.vectors_length if self._DLM__nlp is not None else 0
+                snapshot = KnowledgeSnapshot(dims, self._DLM__connect())
+                if hasattr(self, '_DLM__cursor') and self._DLM__cursor:
+                    snapshot = snapshot.reload(self._DLM__cursor)
+                    snapshot, _ = snapshot.refresh(self._DLM__cursor) # records the current data_version
+                self._DLM__kb_snapshot = snapshot
+            snapshot = self._DLM__kb_snapshot
+    return snapshot
+
+def refresh_snapshot(self) -> list | None:
+    """
+    Refreshes the DLM instance's snapshot and publishes the result to every thread.
+
+    Returns:
+        list or None: The questions that changed, as returned by `KnowledgeSnapshot.refresh`.
+    """
+    with self._DLM__snapshot_lock:
+        snapshot, changed = get_snapshot(self).refresh(self._DLM__cursor)
+        self._DLM__kb_snapshot = snapshot
+    return changed
+
+def semantic_top_k(self, text, k=5, memo=None) -> list:
+    """
+    Finds the stored questions whose document vectors are closest to the text.
+
+    Args:
+        text (str): The (special-stripped) user query.
+        k (int): The number of matches to return.
+        memo (dict, optional): The request's document vector memo (see `doc_vector`).
+
+    Returns:
+        list: (question, answer, cosine score) tuples ordered from most to least similar.
+    """
+    query_vector = doc_vector(self, text, memo)
+    if query_vector is None:
+        return []
+
+    snapshot = get_snapshot(self)
+    matrix = snapshot.matrix
+    if len(matrix) == 0 or matrix.shape[1] != query_vector.shape[0]:
+        return []
+
+    scores = matrix @ query_vector
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
+    return [(snapshot.questions[i], snapshot.answers[i], float(scores[i])) for i in top]
+
+def get_question_vector(self, question):
+    """Returns the stored unit vector for an exact knowledge base question, or None if it isn't indexed."""
+    return get_snapshot(self).vector_of(question)
+
+
+def best_sequence_match(questions, stripped_query, filtered_query, start=0, end=None) -> tuple:
+    """
+    Finds the stored question with the highest sequence similarity to either query variant.
+
+    Each question scores max(ratio vs. stripped query, ratio vs. filtered query); ties keep the
+    earliest question, matching a plain left-to-right scan. A question only gets a full `ratio()`
+    once its cheap upper bounds (`real_quick_ratio()`, which only compares lengths, then
+    `quick_ratio()`) show it could still beat the running best, so the result is identical to
+    scoring every question in full.
+
+    Args:
+        questions (list): The stored questions to score.
+        stripped_query (str): The special-word-stripped user query.
+        filtered_query (str): The filler-free user query.
+        start (int): Index of the first question to score.
+        end (int, optional): Index one past the last question to score. Defaults to the end of the list.
+
+    Returns:
+        tuple: (highest_similarity, index), where index is None if no question scored above 0.
+    """
+    highest_similarity = 0.0
+    best_index = None
+
+    # the query is seq2, so its character index is built once and reused for every stored question
+    matchers = []
+    for query in dict.fromkeys((stripped_query, filtered_query)): # skips the second pass when both are equal
+        matcher = difflib.SequenceMatcher(None)
+        matcher.set_seq2(query)
+        matchers.append(matcher)
+
+    for i in range(start, len(questions) if end is None else end):
+        for matcher in matchers:
+            matcher.set_seq1(questions[i])
+            if matcher.real_quick_ratio() <= highest_similarity or matcher.quick_ratio() <= highest_similarity:
+                continue # cannot beat the current best
+
+            sim = matcher.ratio()
+            if sim > highest_similarity:
+                highest_similarity = sim
+                best_index = i
+
+    return highest_similarity, best_index
+
+# questions held by each scoring worker process (shipped once, when the pool starts), and how many
+# of the pool's patches the worker has applied to them since
+_worker_questions = []
+_worker_patches_applied = 0
+
+def _init_scoring_worker(questions) -> None:
+    """Process pool initializer: keeps a copy of the knowledge base questions in the worker."""
+    global _worker_questions, _worker_patches_applied
+    _worker_questions = questions
+    _worker_patches_applied = 0
+
+def _score_shard(patches, start, end, stripped_query, filtered_query) -> tuple:
+    """
+    Scores one shard of the worker-resident questions (runs inside a pool process).
+
+    The worker first catches up on the (position, question) patches it hasn't applied yet; a None
+    question truncates the list at that position.
+    """
+    global _worker_patches_applied
+    for position, question in patches[_worker_patches_applied:]:
+        if question is None:
+            del _worker_questions[position:]
+        elif position == len(_worker_questions):
+            _worker_questions.append(question)
+        else:
+            _worker_questions[position] = question
+    _worker_patches_applied = len(patches)
+    return best_sequence_match(_worker_questions, stripped_query, filtered_query, start, end)
+
+class ParallelScorer:
+    """
+    Scores knowledge base questions across a persistent process pool.
+
+    The questions are shipped to every worker once, when the pool starts, so each query only sends
+    shard boundaries and the two query strings. When the snapshot changes, only the changed rows are
+    sent: they are appended to a patch log that rides along with every shard, and each worker applies
+    the entries it hasn't seen yet. The pool is only restarted (with the current questions) once the
+    log outgrows `max_patches`. Requests from different threads take turns on the pool (each one
+    already uses every worker). Workers are never forked from the (multi-threaded) DLM process: they
+    start from a fork server where available, or are spawned, so the implementor's entry point
+    must be guarded by `if __name__ == "__main__":`.
+    """
+    # above this many logged patches, restarting the pool is cheaper than shipping the log with every shard
+    max_patches = 1000
+
+    def __init__(self, workers):
+        """
+        Args:
+            workers (int): Number of worker processes.
+        """
+        self.workers = workers
+        self.__executor = None
+        self.__version = None
+        self.__questions = [] # the questions the workers hold once they have applied every patch
+        self.__patches = []
+        self.__lock = threading.Lock()
+
+    def score(self, snapshot, stripped_query, filtered_query) -> tuple:
+        """
+        Scores every question in the snapshot in parallel and reduces to the global best.
+
+        Returns:
+            tuple: (highest_similarity, index) with the same tie-breaking as `best_sequence_match`.
+        """
+        with self.__lock:
+            if self.__executor is not None and self.__version != snapshot.version:
+                self.__patches = self.__patches + self.__diff(snapshot.questions)
+                self.__questions = snapshot.questions # published snapshots are never modified
+                self.__version = snapshot.version
+
+            if self.__executor is None or len(self.__patches) > self.max_patches:
+                self.shutdown()
+                self.__executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.__start_method()),
+                    initializer=_init_scoring_worker,
+                    initargs=(list(snapshot.questions),)
+                )
+                self.__questions = snapshot.questions
+                self.__patches = []
+                self.__version = snapshot.version
+
+            # a few shards per worker evens out questions of very different lengths
+            total = len(snapshot)
+            shard_size = max(1, -(-total // (self.workers * 4)))
+            futures = [
+                self.__executor.submit(_score_shard, self.__patches, start, min(start + shard_size, total), stripped_query, filtered_query)
+                for start in range(0, total, shard_size)
+            ]
+
+            highest_similarity = 0.0
+            best_index = None
+            for future in futures: # shards are in index order, so strict '>' keeps the earliest tie
+                similarity, index = future.result()
+                if similarity > highest_similarity:
+                    highest_similarity = similarity
+                    best_index = index
+
+        return highest_similarity, best_index
+
+    @staticmethod
+    def __start_method() -> str:
+        """Returns "forkserver" where the platform supports it (POSIX), otherwise "spawn"."""
+        return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+    def __diff(self, questions) -> list:
+        """Returns the (position, question) patches that turn the workers' questions into these."""
+        old = self.__questions
+        # an incrementally refreshed snapshot shares the unchanged strings, so most rows compare by identity
+        patches = [(i, new) for i, (previous, new) in enumerate(zip(old, questions)) if previous is not new and previous != new]
+        patches.extend((i, questions[i]) for i in range(len(old), len(questions)))
+        if len(questions) < len(old):
+            patches.append((len(questions), None))
+        return patches
+
+    def shutdown(self) -> None:
+        """Stops the worker processes (a new pool is started on the next call to `score`)."""
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+            self.__patches = []
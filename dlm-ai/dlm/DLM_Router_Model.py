@@ -0,0 +1,261 @@
+import os
+import sqlite3
+import numpy as np
+from .DLM_Compute_Model import compute_db, ensure_db, normalize_and_extract
+
+# characters that signal arithmetic when they appear in a query
+OPERATORS = "+-*/^=%"
+
+def route_features(nlp, queries):
+    """
+    Builds the feature matrix used by the local router.
+
+    Each query is generalized with `normalize_and_extract` (numbers -> [x]) and described by the
+    normalized SpaCy vector of its remaining words, plus its number and operator counts.
+
+    Args:
+        nlp (spacy.Language): The shared SpaCy model.
+        queries (list): Raw user queries or stored query molds.
+
+    Returns:
+        numpy.ndarray: A (len(queries) x (dims + 3)) float32 matrix.
+    """
+    generalized = [normalize_and_extract({"query": query.lower()})["generalized_query"] for query in queries]
+    dims = nlp.vocab.vectors_length
+    features = np.zeros((len(queries), dims + 3), dtype=np.float32)
+
+    for i, doc in enumerate(nlp.pipe(text.replace("[x]", " ") for text in generalized)):
+        if doc.vector_norm != 0:
+            features[i, :dims] = doc.vector / doc.vector_norm
+
+        numbers = generalized[i].count("[x]")
+        operators = sum(generalized[i].count(op) for op in OPERATORS)
+        features[i, dims] = min(numbers, 5) / 5
+        features[i, dims + 1] = min(operators, 5) / 5
+        features[i, dims + 2] = 1.0 if numbers else 0.0
+
+    return features
+
+class LocalRouter:
+    """
+    An in-process logistic-regression classifier that predicts COMPUTE vs. MEMORY routing.
+
+    It only answers when it is confident (probability outside the [lower, upper] band); queries in
+    the uncertain band return None so that the caller falls back to the LLM router.
+    """
+
+    def __init__(self, weights=None, bias=0.0, lower=0.2, upper=0.8):
+        """
+        Args:
+            weights (numpy.ndarray, optional): Trained weights, or None for an untrained router.
+            bias (float): Trained bias term.
+            lower (float): Probabilities at or below this route to MEMORY.
+            upper (float): Probabilities at or above this route to COMPUTE.
+        """
+        self.weights = weights
+        self.bias = bias
+        self.lower = lower
+        self.upper = upper
+
+    @property
+    def trained(self) -> bool:
+        """Whether the router has weights to predict with."""
+        return self.weights is not None
+
+    def probability(self, features):
+        """Returns the probability that each feature row should be routed to COMPUTE."""
+        return 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+
+    def predict(self, nlp, query) -> str | None:
+        """
+        Routes a single query if the classifier is confident.
+
+        Returns:
+            str or None: "compute", "memory", or None when the query falls in the uncertain band.
+        """
+        if not self.trained:
+            return None
+
+        features = route_features(nlp, [query])
+        if features.shape[1] != self.weights.shape[0]:
+            return None
+
+        probability = float(self.probability(features)[0])
+        if probability >= self.upper:
+            return "compute"
+        if probability <= self.lower:
+            return "memory"
+        return None
+
+    def fit(self, features, labels, epochs=300, learning_rate=0.5, l2=1e-3) -> float:
+        """
+        Trains the classifier with class-balanced, L2-regularized batch gradient descent.
+
+        Args:
+            features (numpy.ndarray): Feature matrix from `route_features`.
+            labels (numpy.ndarray): 1 for COMPUTE, 0 for MEMORY.
+
+        Returns:
+            float: Accuracy on the training examples.
+        """
+        labels = labels.astype(np.float32)
+        positives = max(labels.sum(), 1.0)
+        negatives = max(len(labels) - labels.sum(), 1.0)
+        sample_weights = np.where(labels == 1, len(labels) / (2 * positives), len(labels) / (2 * negatives))
+
+        self.weights = np.zeros(features.shape[1], dtype=np.float32)
+        self.bias = 0.0
+        for _ in range(epochs):
+            error = (self.probability(features) - labels) * sample_weights
+            self.weights -= learning_rate * (features.T @ error / len(labels) + l2 * self.weights)
+            self.bias -= learning_rate * float(error.mean())
+
+        predictions = self.probability(features) >= 0.5
+        return float((predictions == (labels == 1)).mean())
+
+    def save(self, path) -> None:
+        """Persists the trained weights as a NumPy .npz file."""
+        np.savez(path, weights=self.weights, bias=np.float32(self.bias), band=np.array([self.lower, self.upper]))
+
+    @classmethod
+    def load(cls, path):
+        """Loads a router saved with `save`, or returns an untrained router if the file is missing or unreadable."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with np.load(path) as data:
+                return cls(data["weights"], float(data["bias"]), float(data["band"][0]), float(data["band"][1]))
+        except (OSError, KeyError, ValueError):
+            return cls()
+
+def routing_key(query) -> str:
+    """
+    Generalizes a query into the shape its routing decision is cached under.
+
+    Numbers become [x] (see `normalize_and_extract`), so "convert 5 km to miles" and
+    "convert 7 km to miles" share one cached decision.
+    """
+    generalized = normalize_and_extract({"query": query.lower()})["generalized_query"]
+    return " ".join(generalized.split())
+
+def log_route(self, query, route) -> None:
+    """
+    Records an LLM routing decision in 'routing_log' so the local router can learn from it, and in
+    'routing_cache' so the same query shape never needs the LLM router again.
+
+    Args:
+        query (str): The raw user query.
+        route (str): "compute" or "memory".
+    """
+    if not hasattr(self, '_DLM__cursor') or not self._DLM__cursor:
+        return
+    key = routing_key(query)
+    try:
+        self._DLM__cursor.execute("INSERT INTO routing_log (query, route) VALUES (?, ?)", (query, route))
+        self._DLM__cursor.execute(
+            """
+            INSERT INTO routing_cache (generalized_query, route) VALUES (?, ?)
+            ON CONFLICT(generalized_query) DO UPDATE SET route = excluded.route
+            """,
+            (key, route)
+        )
+        self._DLM__conn.commit()
+        self._DLM__route_cache.put(key, route)
+    except sqlite3.Error as e:
+        print(f"[SYSTEM]: Database Write Error in log_route: {e}")
+
+def get_cached_route(self, query) -> str | None:
+    """
+    Looks up the cached routing decision for the query's generalized shape.
+
+    The in-memory LRU front is checked first; misses fall through to the persistent
+    'routing_cache' table and are promoted into the front.
+
+    Returns:
+        str or None: "compute" or "memory", or None if this query shape was never routed by the LLM.
+    """
+    key = routing_key(query)
+    route = self._DLM__route_cache.get(key)
+    if route is not None or not hasattr(self, '_DLM__cursor') or not self._DLM__cursor:
+        return route
+
+    self._DLM__cursor.execute("SELECT route FROM routing_cache WHERE generalized_query = ?", (key,))
+    row = self._DLM__cursor.fetchone()
+    if row is None:
+        return None
+
+    self._DLM__route_cache.put(key, row[0])
+    return row[0]
+
+def evict_routes(self, query=None) -> int:
+    """
+    Evicts cached routing decisions from both the in-memory front and the persistent table.
+
+    Args:
+        query (str, optional): Evict only this query's generalized shape. If None, evict everything.
+
+    Returns:
+        int: The number of persisted decisions removed.
+    """
+    if query is None:
+        self._DLM__route_cache.invalidate()
+        sql, params = "DELETE FROM routing_cache", ()
+    else:
+        key = routing_key(query)
+        self._DLM__route_cache.invalidate(lambda cached_key, route: cached_key == key)
+        sql, params = "DELETE FROM routing_cache WHERE generalized_query = ?", (key,)
+
+    if not hasattr(self, '_DLM__cursor') or not self._DLM__cursor:
+        return 0
+    try:
+        self._DLM__cursor.execute(sql, params)
+        self._DLM__conn.commit()
+        return self._DLM__cursor.rowcount
+    except sqlite3.Error as e:
+        print(f"[SYSTEM]: Database Write Error in evict_routes: {e}")
+        return 0
+
+def train_router(self, router) -> dict:
+    """
+    Retrains the local router from logged LLM decisions, knowledge base questions (MEMORY) and
+    compute skill molds (COMPUTE).
+
+    Args:
+        router (LocalRouter): The router to (re)train in place.
+
+    Returns:
+        dict: 'examples', 'compute' and 'memory' counts, training 'accuracy' (None if not trained).
+    """
+    queries = []
+    labels = []
+
+    if hasattr(self, '_DLM__cursor') and self._DLM__cursor:
+        self._DLM__cursor.execute("SELECT query, route FROM routing_log")
+        for query, route in self._DLM__cursor.fetchall():
+            queries.append(query)
+            labels.append(1 if route == "compute" else 0)
+
+        self._DLM__cursor.execute("SELECT question FROM knowledge_base")
+        for (question,) in self._DLM__cursor.fetchall():
+            queries.append(question)
+            labels.append(0)
+
+    ensure_db()
+    for (query_mold,) in compute_db().execute("SELECT query_mold FROM skills"):
+        queries.append(query_mold)
+        labels.append(1)
+
+    labels = np.array(labels, dtype=np.float32)
+    stats = {
+        "examples": len(queries),
+        "compute": int(labels.sum()),
+        "memory": int(len(labels) - labels.sum()),
+        "accuracy": None
+    }
+
+    # both routes are needed for a meaningful decision boundary
+    if stats["compute"] == 0 or stats["memory"] == 0:
+        return stats
+
+    stats["accuracy"] = router.fit(route_features(self._DLM__nlp, queries), labels)
+    return stats